@@ -1,6 +1,9 @@
 import streamlit as st
 from typing import Dict, List, Optional
 
+from app.config.path_options import filter_paths, sorted_paths
+
+
 class FileTreeSelector:
     """
     Flat searchable file selector with Select All.
@@ -11,8 +14,8 @@ class FileTreeSelector:
         self.file_metadata = file_metadata or {}
         self.state_key = state_key
 
-        # Flatten file paths
-        self.options: List[str] = sorted(file_metadata.keys(), key=str.lower)
+        # Flatten file paths (sorted and lowercased once per distinct path set, not on every rerun)
+        self.options, self.options_lower = sorted_paths(frozenset(self.file_metadata))
 
         # Internal session-state keys (NOT used by widgets)
         self._internal_selected = f"{state_key}_internal_selected"
@@ -48,11 +51,8 @@ class FileTreeSelector:
         st.session_state[self._internal_search] = search_val
         search_lower = search_val.lower()
 
-        # Filter options
-        filtered = [
-            p for p in self.options
-            if search_lower in p.lower()
-        ]
+        # Filter options against the precomputed lowercase paths
+        filtered = filter_paths(self.options, self.options_lower, search_lower)
 
         # Default select-all based on internal selection
         default_all = len(filtered) > 0 and set(default_selected) >= set(filtered)
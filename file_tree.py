@@ -8,7 +8,8 @@ and recursive search that expands only matching branches.
 
 from __future__ import annotations
 
-from typing import Dict, Iterable, List, Optional, Set
+import bisect
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
 
 import streamlit as st
 
@@ -18,22 +19,28 @@ class FileNode:
 
     def __init__(self, name: str, is_file: bool = False, file_path: Optional[str] = None):
         self.name = name
+        self._name_lower = name.lower()  # searched on every query; lowered once
         self.is_file = is_file
         self.file_path = file_path  # Full path for file nodes
         self.children: Dict[str, "FileNode"] = {}
+        # File paths at or below this node; filled lazily once the tree is built
+        self._all_files: Optional[FrozenSet[str]] = None
+        # Child names kept sorted as children are added, so renders only iterate
+        self._child_order: List[str] = []
 
     def add_child(self, name: str, is_file: bool = False, file_path: Optional[str] = None) -> "FileNode":
         """Add a child node if not already present."""
-        if name not in self.children:
-            self.children[name] = FileNode(name, is_file, file_path)
-        child = self.children[name]
+        child = self.children.get(name)
+        if child is None:
+            child = self.children[name] = FileNode(name, is_file, file_path)
+            bisect.insort(self._child_order, name)
         if is_file:
             child.is_file = True
             child.file_path = file_path
         return child
 
     def iter_children_sorted(self) -> Iterable["FileNode"]:
-        for name in sorted(self.children):
+        for name in self._child_order:
             yield self.children[name]
 
 
@@ -49,9 +56,11 @@ class FileTreeBuilder:
             file_metadata: Mapping file_path -> metadata dict
 
         Returns:
-            Dict mapping root category name -> FileNode
+            Dict mapping root category name -> FileNode, in display order ('Other Files' last)
         """
         roots: Dict[str, FileNode] = {}
+        # Folder chain (root, drive, *parent parts) -> node; files sharing a folder skip re-walking it
+        folders: Dict[Tuple[str, ...], FileNode] = {}
 
         for file_path, metadata in file_metadata.items():
             site_path = metadata.get("sitePath")
@@ -69,37 +78,89 @@ class FileTreeBuilder:
             if site_path and drive_name:
                 # Build SharePoint hierarchy
                 root_name = f"SharePoint: {site_name}" if site_name else site_path
-                if root_name not in roots:
-                    roots[root_name] = FileNode(root_name)
-
-                current = roots[root_name]
-                current = current.add_child(drive_name)
-
+                folder_parts: Tuple[str, ...] = (root_name, drive_name)
                 if parent_path:
-                    path_parts = [part for part in parent_path.strip("/").split("/") if part]
-                    for part in path_parts:
-                        current = current.add_child(part)
+                    folder_parts += tuple(part for part in parent_path.split("/") if part)
 
+                current = FileTreeBuilder._folder_node(roots, folders, folder_parts)
                 current.add_child(display_name, is_file=True, file_path=file_path)
 
             else:
                 # Other / flat structure
-                root_name = "Other Files"
-                if root_name not in roots:
-                    roots[root_name] = FileNode(root_name)
-                roots[root_name].add_child(display_name, is_file=True, file_path=file_path)
+                current = FileTreeBuilder._folder_node(roots, folders, ("Other Files",))
+                current.add_child(display_name, is_file=True, file_path=file_path)
+
+        # Children are ordered as they're added; order the roots once here
+        return {name: roots[name] for name in sorted(roots, key=lambda x: (x == "Other Files", x.lower()))}
 
-        return roots
+    @staticmethod
+    def build_search_index(roots: Dict[str, FileNode]) -> Tuple[List[FileNode], List[str], List[int]]:
+        """
+        Flatten the tree for search: (nodes, lowercase names, parent index or -1), in preorder.
+
+        A query is then one pass over the flat name list plus a walk up parent indices,
+        with no per-node method calls or recursion.
+        """
+        nodes: List[FileNode] = []
+        lowered: List[str] = []
+        parents: List[int] = []
+        stack = [(root, -1) for root in reversed(list(roots.values()))]
+        while stack:
+            node, parent_idx = stack.pop()
+            idx = len(nodes)
+            nodes.append(node)
+            lowered.append(node._name_lower)
+            parents.append(parent_idx)
+            stack.extend((child, idx) for child in node.children.values())
+        return nodes, lowered, parents
+
+    @staticmethod
+    def _folder_node(
+        roots: Dict[str, FileNode], folders: Dict[Tuple[str, ...], FileNode], parts: Tuple[str, ...]
+    ) -> FileNode:
+        """Return the folder node for parts, creating it (and any missing ancestors) only once."""
+        node = folders.get(parts)
+        if node is not None:
+            return node
+        # Step back to the deepest folder already built, then create only the new tail
+        depth = len(parts) - 1
+        while depth and parts[:depth] not in folders:
+            depth -= 1
+        if depth:
+            node = folders[parts[:depth]]
+        else:
+            node = roots.get(parts[0])
+            if node is None:
+                node = roots[parts[0]] = FileNode(parts[0])
+            folders[parts[:1]] = node
+            depth = 1
+        for end in range(depth + 1, len(parts) + 1):
+            node = node.add_child(parts[end - 1])
+            folders[parts[:end]] = node
+        return node
 
 
 class FileTreeSelector:
     """Interactive file tree selector with search and multi-level checkboxes."""
 
+    # session_state slot holding (fingerprint, tree, search index) across Streamlit reruns
+    _TREE_CACHE_KEY = "_file_tree_cache"
+    # session_state slot holding (tree, query, ids of matching nodes)
+    _MATCH_CACHE_KEY = "_file_tree_match_cache"
+    # session_state slot holding the selected file paths; collapsed folders render no file
+    # widgets, and Streamlit drops the state of widgets that were not rendered in a run
+    _SELECTED_KEY = "_file_tree_selected"
+    # session_state slot holding the last seen value of each 'Select all' checkbox, so a
+    # checked box is applied to its files once rather than again on every rerun
+    _CHECKBOX_STATES_KEY = "_file_tree_checkbox_states"
+    # Metadata fields that decide where a file sits in the tree
+    _TREE_FIELDS = ("sitePath", "siteName", "driveName", "parentPath", "name", "fileName", "file_name")
+
     def __init__(self, file_metadata: List[Dict]):
         self.file_metadata = self._iter_items(file_metadata)
-        self.tree = FileTreeBuilder.build_tree(self.file_metadata)
+        self.tree, self._search_index = self._cached_tree(self.file_metadata)
         self.selected_files: Set[str] = set()
-        self._checkbox_states: Dict[str, bool] = {}
+        self._checkbox_states: Dict[str, bool] = st.session_state.setdefault(self._CHECKBOX_STATES_KEY, {})
 
     # ------------------------------------------------------------------
     # Helpers
@@ -116,56 +177,108 @@ class FileTreeSelector:
                 out[fp] = md
         return out
 
+    @classmethod
+    def _cached_tree(
+        cls, file_metadata: Dict[str, Dict]
+    ) -> Tuple[Dict[str, FileNode], Tuple[List[FileNode], List[str], List[int]]]:
+        """
+        Return the tree for file_metadata and its search index, reusing the ones built on an
+        earlier rerun.
+
+        Streamlit reruns the script (and constructs a new selector) on every interaction,
+        so the tree is kept in session_state and rebuilt only when the fingerprint of the
+        tree-shaping metadata changes.
+        """
+        fingerprint = hash(frozenset(
+            (file_path, *(str(metadata.get(field)) for field in cls._TREE_FIELDS))
+            for file_path, metadata in file_metadata.items()
+        ))
+        cached = st.session_state.get(cls._TREE_CACHE_KEY)
+        if cached is None or cached[0] != fingerprint:
+            tree = FileTreeBuilder.build_tree(file_metadata)
+            cached = (fingerprint, tree, FileTreeBuilder.build_search_index(tree))
+            st.session_state[cls._TREE_CACHE_KEY] = cached
+        return cached[1], cached[2]
+
     def _file_checkbox_key(self, file_path: str) -> str:
         return f"file::{file_path}"
 
     def _folder_checkbox_key(self, parent_key: str, node_name: str) -> str:
         return f"folder::{parent_key}/{node_name}"
 
-    def _get_all_files_in_node(self, node: FileNode) -> Set[str]:
-        """Recursively collect all file paths under a node."""
-        files: Set[str] = set()
-        if node.is_file and node.file_path:
-            files.add(node.file_path)
-        for child in node.children.values():
-            files.update(self._get_all_files_in_node(child))
-        return files
-
-    def _node_matches_search(self, node: FileNode, query: str) -> bool:
-        """True if node or any descendant name contains query."""
-        if not query:
-            return True
-        lowered = node.name.lower()
-        if query in lowered:
-            return True
-        return any(self._node_matches_search(child, query) for child in node.children.values())
+    def _folder_expanded_key(self, parent_key: str, node_name: str) -> str:
+        return f"expanded::{parent_key}/{node_name}"
 
-    def _set_files_under_node(self, node: FileNode, value: bool, parent_key: str = "") -> None:
-        """Set all descendant nodes to the provided boolean value."""
-        if node.is_file and node.file_path:
-            key = self._file_checkbox_key(node.file_path)
-        
-            # If a parent is selected, mark file as selected before rendering
-            if parent_selected and not st.session_state.get(key, False):
-                st.session_state[key] = True
-        
-            # ✅ Let Streamlit manage the value
-            checked = container.checkbox(node.name, key=key)
-        
-            # Sync with our selected set
-            if checked:
-                self.selected_files.add(node.file_path)
+    def _get_all_files_in_node(self, node: FileNode) -> FrozenSet[str]:
+        """
+        Collect all file paths under a node.
+
+        Computed once per subtree with a post-order walk and cached on each node; the tree
+        is not modified after it is built, so the cached sets stay valid.
+        """
+        cached = node._all_files
+        if cached is not None:
+            return cached
+        stack = [(node, False)]
+        while stack:
+            current, children_done = stack.pop()
+            if current._all_files is not None:
+                continue
+            if children_done:
+                own = (current.file_path,) if current.is_file and current.file_path else ()
+                current._all_files = frozenset(own).union(
+                    *(child._all_files for child in current.children.values())
+                )
             else:
-                self.selected_files.discard(node.file_path)
-            return
+                stack.append((current, True))
+                stack.extend((child, False) for child in current.children.values())
+        return node._all_files
+
+    def _compute_match_set(self, query: str) -> Set[int]:
+        """ids of nodes whose name, or some descendant's name, contains query."""
+        nodes, lowered, parents = self._search_index
+        visible = [False] * len(nodes)
+        for idx in [idx for idx, name in enumerate(lowered) if query in name]:
+            # Mark the hit and its ancestors; stop at the first one already marked
+            while idx >= 0 and not visible[idx]:
+                visible[idx] = True
+                idx = parents[idx]
+        return {id(node) for node, shown in zip(nodes, visible) if shown}
+
+    def _match_ids(self, query: str) -> Set[int]:
+        """Matching node ids for query, computed once per (tree, query) and kept across reruns."""
+        # The cache holds the tree itself, so its node ids can't be reused while it's cached
+        cached = st.session_state.get(self._MATCH_CACHE_KEY)
+        if cached is None or cached[0] is not self.tree or cached[1] != query:
+            cached = (self.tree, query, self._compute_match_set(query))
+            st.session_state[self._MATCH_CACHE_KEY] = cached
+        return cached[2]
 
-        for child in node.children.values():
-            child_parent_key = f"{parent_key}/{node.name}" if parent_key else node.name
-            if not child.is_file:
-                child_folder_key = self._folder_checkbox_key(child_parent_key, child.name)
+    def _set_files_under_node(self, node: FileNode, value: bool, parent_key: str = "") -> None:
+        """
+        Set all descendant nodes to the provided boolean value.
+
+        parent_key is the node's own path key, i.e. the parent_key its children are rendered
+        with. Files are selected with one set operation on the node's cached file set.
+        """
+        files = self._get_all_files_in_node(node)
+        if value:
+            self.selected_files |= files
+        else:
+            self.selected_files -= files
+        for file_path in files:
+            st.session_state[self._file_checkbox_key(file_path)] = value
+
+        stack = [(node, parent_key)]
+        while stack:
+            current, current_path = stack.pop()
+            for child in current.children.values():
+                if child.is_file:
+                    continue
+                child_folder_key = self._folder_checkbox_key(current_path, child.name)
                 st.session_state[child_folder_key] = value
                 self._checkbox_states[child_folder_key] = value
-            self._set_files_under_node(child, value, child_parent_key)
+                stack.append((child, f"{current_path}/{child.name}"))
 
     # ------------------------------------------------------------------
     # Recursive Renderer
@@ -178,8 +291,15 @@ class FileTreeSelector:
         parent_selected: bool = False,
         search_query: str = "",
         container=None,
+        match_ids: Optional[Set[int]] = None,
+        max_initial_depth: int = 2,
     ) -> None:
-        """Recursively render node (folder or file) with checkboxes."""
+        """
+        Recursively render node (folder or file) with checkboxes.
+
+        match_ids: ids of nodes matching search_query (see _match_ids), or None to show all.
+        max_initial_depth: folders above this level start expanded; deeper ones start collapsed.
+        """
         if container is None:
             container = st
 
@@ -190,7 +310,7 @@ class FileTreeSelector:
                 self.selected_files.add(node.file_path)
 
             checked = container.checkbox(
-                node.name,
+                "\u2003" * level + node.name,
                 value=st.session_state.get(key, node.file_path in self.selected_files),
                 key=key,
             )
@@ -204,59 +324,77 @@ class FileTreeSelector:
         if not node.children:
             return
 
-        expanded = level == 0 or bool(search_query)
-        with container.expander(node.name, expanded=expanded):
-            folder_key = self._folder_checkbox_key(parent_key, node.name)
-            previous_state = self._checkbox_states.get(folder_key, False)
-            folder_selected = container.checkbox("Select all", key=folder_key, value=previous_state)
-
-            if parent_selected and not folder_selected:
-                folder_selected = True
-                st.session_state[folder_key] = True
-
-            if folder_selected != previous_state:
-                # Record new state
-                self._checkbox_states[folder_key] = folder_selected
-                current_path = f"{parent_key}/{node.name}" if parent_key else node.name
-                # Apply change to all descendants
-                self._set_files_under_node(node, folder_selected, current_path)
-            
-                # If unselecting, also clear all deeper folder checkboxes in state
-                if not folder_selected:
-                    for child in node.children.values():
-                        if not child.is_file:
-                            child_key = self._folder_checkbox_key(current_path, child.name)
-                            st.session_state[child_key] = False
-                            self._checkbox_states[child_key] = False
-            else:
-                self._checkbox_states.setdefault(folder_key, folder_selected)
+        # st.expander runs its body even when collapsed, so every descendant widget would be
+        # built on each rerun; a toggle lets the child loop be skipped for closed folders
+        expanded_key = self._folder_expanded_key(parent_key, node.name)
+        st.session_state.setdefault(expanded_key, level < max_initial_depth)
+        indent = "\u2003" * level
+        expanded = container.toggle(f"{indent}📁 {node.name}", key=expanded_key) or bool(search_query)
+
+        folder_key = self._folder_checkbox_key(parent_key, node.name)
+        previous_state = self._checkbox_states.get(folder_key, False)
+        folder_selected = container.checkbox(f"{indent}Select all", key=folder_key, value=previous_state)
+
+        if parent_selected and not folder_selected:
+            folder_selected = True
+            st.session_state[folder_key] = True
+
+        if folder_selected != previous_state:
+            # Record new state
+            self._checkbox_states[folder_key] = folder_selected
+            current_path = f"{parent_key}/{node.name}" if parent_key else node.name
+            # Apply change to all descendants
+            self._set_files_under_node(node, folder_selected, current_path)
+        
+            # If unselecting, also clear all deeper folder checkboxes in state
+            if not folder_selected:
+                for child in node.children.values():
+                    if not child.is_file:
+                        child_key = self._folder_checkbox_key(current_path, child.name)
+                        st.session_state[child_key] = False
+                        self._checkbox_states[child_key] = False
+        else:
+            self._checkbox_states.setdefault(folder_key, folder_selected)
 
-            for child in node.iter_children_sorted():
-                if not self._node_matches_search(child, search_query):
-                    continue
-                self._render_node(
-                    child,
-                    level=level + 1,
-                    parent_key=f"{parent_key}/{node.name}" if parent_key else node.name,
-                    parent_selected=parent_selected or folder_selected,
-                    search_query=search_query,
-                    container=container,
-                )
+        # Hidden descendants keep their selection in _SELECTED_KEY, not in their widgets
+        if not expanded:
+            return
+
+        for child in node.iter_children_sorted():
+            if match_ids is not None and id(child) not in match_ids:
+                continue
+            self._render_node(
+                child,
+                level=level + 1,
+                parent_key=f"{parent_key}/{node.name}" if parent_key else node.name,
+                parent_selected=parent_selected or folder_selected,
+                search_query=search_query,
+                container=container,
+                match_ids=match_ids,
+                max_initial_depth=max_initial_depth,
+            )
 
     # ------------------------------------------------------------------
     # Main Renderer
     # ------------------------------------------------------------------
-    def render(self, container=None) -> List[str]:
-        """Render the entire tree and return selected file paths."""
+    def render(self, container=None, max_initial_depth: int = 2) -> List[str]:
+        """
+        Render the entire tree and return selected file paths.
+
+        max_initial_depth: number of folder levels shown expanded until the user toggles them.
+        """
         if container is None:
             container = st
 
-        # Rebuild selected files from widget state so deselections propagate.
-        self.selected_files = {
-            key.split("::", 1)[1]
-            for key, value in st.session_state.items()
-            if key.startswith("file::") and value
-        }
+        # Start from the last run's selection, then apply file widget state so deselections
+        # propagate; files inside collapsed folders have no widget state to apply.
+        self.selected_files = set(st.session_state.get(self._SELECTED_KEY, ()))
+        for key, value in st.session_state.items():
+            if key.startswith("file::"):
+                if value:
+                    self.selected_files.add(key.split("::", 1)[1])
+                else:
+                    self.selected_files.discard(key.split("::", 1)[1])
 
         # Search bar
         search_query = container.text_input("🔎 Search files", "").strip().lower()
@@ -271,15 +409,16 @@ class FileTreeSelector:
                 root_folder_key = self._folder_checkbox_key("root", root.name)
                 st.session_state[root_folder_key] = global_selected
                 self._checkbox_states[root_folder_key] = global_selected
-                self._set_files_under_node(root, global_selected, "root")
+                self._set_files_under_node(root, global_selected, f"root/{root.name}")
         else:
             self._checkbox_states.setdefault(global_key, global_selected)
 
-        # Sort so 'Other Files' is last
-        root_names = sorted(self.tree.keys(), key=lambda x: (x == "Other Files", x.lower()))
-        for root_name in root_names:
-            root = self.tree[root_name]
-            if not self._node_matches_search(root, search_query):
+        # Without a query every node is shown, so no match checks run at all
+        match_ids = self._match_ids(search_query) if search_query else None
+
+        # Roots are already in display order ('Other Files' last)
+        for root in self.tree.values():
+            if match_ids is not None and id(root) not in match_ids:
                 continue
             self._render_node(
                 root,
@@ -288,7 +427,10 @@ class FileTreeSelector:
                 parent_selected=global_selected,
                 search_query=search_query,
                 container=container,
+                match_ids=match_ids,
+                max_initial_depth=max_initial_depth,
             )
 
+        st.session_state[self._SELECTED_KEY] = self.selected_files
         container.caption(f"**{len(self.selected_files)}** files selected")
         return sorted(self.selected_files)
@@ -25,24 +25,28 @@ class FileTreeSelector:
     def _folder_checkbox_key(self, parent_key: str, node_name: str) -> str:
         return f"folder::{parent_key}/{node_name}" if parent_key else f"folder::{node_name}"
     
+    def _iter_subtree(self, node: FileNode) -> Iterator[FileNode]:
+        """Yield node and all its descendants with an explicit stack (no recursion limit)."""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            yield current
+            stack.extend(current.children.values())
+    
     def _get_all_files_in_node(self, node: FileNode, search_query: str = "") -> Set[str]:
-        """Recursively collect all file paths under a node that match search."""
-        files: Set[str] = set()
-        if node.is_file and node.file_path:
-            if self._node_matches_search(node, search_query):
-                files.add(node.file_path)
-        for child in node.children.values():
-            files.update(self._get_all_files_in_node(child, search_query))
-        return files
+        """Collect all file paths under a node that match search."""
+        return {
+            current.file_path
+            for current in self._iter_subtree(node)
+            if current.is_file and current.file_path
+            and (not search_query or search_query in current.name.lower())
+        }
     
     def _node_matches_search(self, node: FileNode, query: str) -> bool:
         """True if node or any descendant name contains query."""
         if not query:
             return True
-        lowered = node.name.lower()
-        if query in lowered:
-            return True
-        return any(self._node_matches_search(child, query) for child in node.children.values())
+        return any(query in current.name.lower() for current in self._iter_subtree(node))
     
     def _set_files_under_node(self, node: FileNode, value: bool, parent_key: str = "", search_query: str = "") -> None:
         """Set all descendant nodes to the provided boolean value, respecting search filter."""
@@ -1,10 +1,26 @@
+import asyncio
+import functools
+import hashlib
+import importlib.util
+import json
+import multiprocessing
 import os
-import pickle
+import queue
+import sqlite3
 import threading
+import time
+import uuid
+from contextlib import closing
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
+import httpx
+import numpy as np
+from aiolimiter import AsyncLimiter
+from openai import APIConnectionError, APITimeoutError, RateLimitError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 from azure.identity import DefaultAzureCredential, get_bearer_token_provider
 from llama_index.embeddings.azure_openai import AzureOpenAIEmbedding
 from llama_index.llms.azure_openai import AzureOpenAI
@@ -13,27 +29,228 @@ from llama_index.core.node_parser import SemanticSplitterNodeParser, SentenceSpl
 from llama_index.core.retrievers import VectorIndexRetriever
 from llama_index.core.vector_stores import MetadataFilter, MetadataFilters, VectorStoreQuery
 from llama_index.readers import SimpleDirectoryReader
-from llama_index.core.schema import Document as LlamaIndexDocument
+from llama_index.core.readers.base import BaseReader
+from llama_index.core.schema import Document as LlamaIndexDocument, MetadataMode, TextNode
 from risklab.vectorstore.llamaindex import RisklabVectorStore
 
 RISKLAB_OPEN_AI_KEY = os.getenv("RISKLAB_OPEN_AI_KEY")
+AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
+
+# One credential + token provider shared by the embedding model and the LLM.
+_CREDENTIAL = DefaultAzureCredential()
+_TOKEN_PROVIDER = get_bearer_token_provider(_CREDENTIAL, "https://cognitiveservices.azure.com/.default")
+
+# One pooled HTTP/2 client for all Azure OpenAI calls: keeps TLS connections warm
+# and multiplexes concurrent embedding/LLM requests. httpx needs the optional `h2`
+# package for HTTP/2 (httpx[http2]); without it the clients fall back to HTTP/1.1.
+_HTTP2 = importlib.util.find_spec("h2") is not None
+_HTTP_CLIENT = httpx.Client(
+    http2=_HTTP2,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+)
+# The async calls (batched embeddings, store writes) get the same treatment. An
+# AsyncClient's connections belong to the loop that opened them, so all async work
+# runs on one long-lived loop in a daemon thread instead of a fresh asyncio.run().
+_ASYNC_HTTP_CLIENT = httpx.AsyncClient(
+    http2=_HTTP2,
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    timeout=30.0,
+)
+# Started on first use, so importing the module doesn't spawn a thread.
+_ASYNC_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_ASYNC_LOOP_LOCK = threading.Lock()
+
+
+def _async_loop() -> asyncio.AbstractEventLoop:
+    global _ASYNC_LOOP
+    with _ASYNC_LOOP_LOCK:
+        if _ASYNC_LOOP is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="index-async-loop", daemon=True).start()
+            _ASYNC_LOOP = loop
+        return _ASYNC_LOOP
+
+
+def _run_async(coro):
+    """Run `coro` on the shared loop and block until it finishes; safe from any thread but the loop's own."""
+    loop = _async_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        # Blocking here would wait on a result only this (blocked) loop can produce.
+        coro.close()
+        raise RuntimeError("_run_async called from the shared event loop; await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+# Inputs per /embeddings request; Azure accepts arrays of inputs natively.
+EMBED_BATCH_SIZE = 16
+# Embedding requests in flight at once, and the deployment's tokens-per-minute quota.
+EMBED_CONCURRENCY = 48
+EMBED_TOKENS_PER_MINUTE = 240_000
+
+# Throttling and dropped connections are retried with jittered exponential backoff
+# instead of failing the whole run on the first 429.
+_retry_transient = retry(
+    wait=wait_random_exponential(min=1, max=60),
+    stop=stop_after_attempt(8),
+    retry=retry_if_exception_type((RateLimitError, APIConnectionError, APITimeoutError, httpx.TransportError)),
+    reraise=True,
+)
 
 Settings.embed_model = AzureOpenAIEmbedding(
     engine="text-embedding-3-small",
-    azure_ad_token_provider=get_bearer_token_provider(DefaultAzureCredential()),
-    azure_endpoint="https://cognitiveservices.azure.com/.default",
+    embed_batch_size=EMBED_BATCH_SIZE,
+    http_client=_HTTP_CLIENT,
+    async_http_client=_ASYNC_HTTP_CLIENT,
+    azure_ad_token_provider=_TOKEN_PROVIDER,
+    azure_endpoint=AZURE_OPENAI_ENDPOINT,
 )
 Settings.llm = AzureOpenAI(
     engine="gpt-4o",
-    azure_ad_token_provider=get_bearer_token_provider(DefaultAzureCredential()),
-    azure_endpoint="https://cognitiveservices.azure.com/.default",
+    http_client=_HTTP_CLIENT,
+    async_http_client=_ASYNC_HTTP_CLIENT,
+    azure_ad_token_provider=_TOKEN_PROVIDER,
+    azure_endpoint=AZURE_OPENAI_ENDPOINT,
+)
+
+# Shared pool for independent Risklab round-trips (vector + summary lookups).
+_RETRIEVAL_POOL = ThreadPoolExecutor(max_workers=4)
+# Runs the file producer (in-process reads, or collecting worker-process parses) while the
+# event loop prepares already-parsed files.
+_READER_POOL = ThreadPoolExecutor(max_workers=1)
+_DELETION_LOCK_STRIPES = 64
+# Upper bound on nodes fetched per file during deletion lookups; results are
+# already restricted to the file by a metadata filter.
+_DELETE_SCAN_LIMIT = 10_000
+
+SUMMARY_PROMPT = (
+    "Produce a concise and comprehensive summary description. "
+    "Start with 10–25 words describing the document type and purpose. "
+    "Aim for 50–150 words total."
 )
 
+# Documents summarized per LLM call. Each one is sent as a "===DOC n: name===" row and the
+# model answers with a JSON object keyed by row number.
+SUMMARY_BATCH_SIZE = 6
+SUMMARY_BATCH_PROMPT = (
+    "You will receive several documents, each introduced by a line '===DOC <n>: <name>==='. "
+    "Summarize each document separately, following these instructions: " + SUMMARY_PROMPT + " "
+    'Reply with only a JSON object mapping each document number to its summary, e.g. {"1": "...", "2": "..."}.'
+)
+
+# Embeddings from earlier runs, keyed by (embed model, text hash) and read only for the texts
+# a run needs. Rows unused for the longest time are dropped beyond EMBED_CACHE_MAX_ROWS.
+EMBED_CACHE_PATH = Path.home() / ".cache" / "uga-ai" / "embed_cache.db"
+EMBED_CACHE_MAX_ROWS = 500_000
+# Keys per SELECT, below SQLite's bound-parameter limit.
+EMBED_CACHE_LOOKUP_CHUNK = 500
+
+# Semantic splitting embeds every sentence group, so it is opt-in and only for long documents.
+SEMANTIC_SPLIT_MIN_CHARS = 20_000
+# A full-document SummaryIndex pass is opt-in and only worth it for long documents.
+HIGH_QUALITY_SUMMARY_MIN_NODES = 50
+
+KB_EXTS = [".pdf", ".pptx", ".docx", ".xlsx", ".txt", ".parquet"]
+# Local record of (file_path, file_hash) as of each file's last successful index.
+HASH_DB_PATH = Path.home() / ".cache" / "uga-ai" / "hashes.db"
+# Parsed files buffered between the reader thread and the indexing loop.
+READ_QUEUE_SIZE = 64
+
+
+def _quantize_embeddings(nodes: List[TextNode]) -> None:
+    """Replace each node's float embedding with int8 values plus a per-vector scale.
+
+    `embedding ≈ int8 * embedding_scale`; cosine similarity is unaffected by the scale,
+    so cosine-ranked search works on the quantized vectors directly.
+    """
+    if not nodes:
+        return
+    emb = np.asarray([n.embedding for n in nodes], dtype=np.float32)
+    scales = np.abs(emb).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.round(emb / scales[:, None]).astype(np.int8)
+    for node, vec, scale in zip(nodes, quantized, scales.tolist()):
+        node.embedding = vec.tolist()
+        node.metadata["embedding_scale"] = scale
+        node.excluded_embed_metadata_keys.append("embedding_scale")
+        node.excluded_llm_metadata_keys.append("embedding_scale")
+
+
+class ParquetDocumentReader(BaseReader):
+    """Read precomputed documents from a Parquet file with `text` and JSON `metadata` columns.
+
+    The file is memory-mapped and decoded one record batch at a time, so a large cache
+    never has to be materialized in full the way an unpickled list of Documents does.
+    """
+
+    def load_data(self, file: Path, extra_info: Optional[Dict] = None) -> List[LlamaIndexDocument]:
+        import pyarrow.parquet as pq
+
+        docs = []
+        for batch in pq.ParquetFile(str(file), memory_map=True).iter_batches(columns=["text", "metadata"]):
+            for text, metadata in zip(batch.column("text").to_pylist(), batch.column("metadata").to_pylist()):
+                docs.append(LlamaIndexDocument(text=text or "", metadata={**json.loads(metadata or "{}"), **(extra_info or {})}))
+        return docs
+
+    @staticmethod
+    def write(docs: List[LlamaIndexDocument], path: Path) -> None:
+        """Convert documents (e.g. an old pickle cache) into the layout `load_data` expects."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.table({
+            "text": [d.text for d in docs],
+            "metadata": [json.dumps(d.metadata, default=str) for d in docs],
+        })
+        pq.write_table(table, str(path))
+
+
+_FILE_EXTRACTOR = {".parquet": ParquetDocumentReader()}
+
+
+def _read_kb_file(file_path: str) -> List[LlamaIndexDocument]:
+    """Parse one KB file; runs in a parse worker process (see IndexManager._astream_index)."""
+    return SimpleDirectoryReader(input_files=[file_path], file_extractor=_FILE_EXTRACTOR).load_data()
+
+
+class VectorizedSemanticSplitter(SemanticSplitterNodeParser):
+    """SemanticSplitterNodeParser with breakpoint detection done in NumPy instead of Python loops."""
+
+    def _calculate_distances_between_sentence_groups(self, sentences) -> List[float]:
+        if len(sentences) < 2:
+            return []
+        emb = np.asarray([s["combined_sentence_embedding"] for s in sentences], dtype=np.float32)
+        emb /= np.maximum(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12)
+        # Cosine similarity of every consecutive pair in a single pass.
+        cos = np.einsum("nd,nd->n", emb[:-1], emb[1:])
+        return (1.0 - cos).tolist()
+
+    def _build_node_chunks(self, sentences, distances) -> List[str]:
+        if not distances:
+            return [" ".join(s["sentence"] for s in sentences)]
+        dist = np.asarray(distances)
+        threshold = np.percentile(dist, self.breakpoint_percentile_threshold)
+        chunks, start = [], 0
+        for idx in np.flatnonzero(dist > threshold):
+            chunks.append("".join(s["sentence"] for s in sentences[start:idx + 1]))
+            start = idx + 1
+        if start < len(sentences):
+            chunks.append("".join(s["sentence"] for s in sentences[start:]))
+        return chunks
+
 
 class IndexManager:
-    def __init__(self, use_streamlit: bool = True):
+    def __init__(self, use_streamlit: bool = True, semantic_split: bool = False,
+                 high_quality_summary: bool = False, quantize_embeddings: bool = False):
         self.logger = print
-        self._deletion_lock = threading.Lock()
+        self.semantic_split = semantic_split
+        self.high_quality_summary = high_quality_summary
+        self.quantize_embeddings = quantize_embeddings
+        # Striped locks: deletions of the same file serialize, unrelated files don't.
+        self._deletion_locks = [threading.Lock() for _ in range(_DELETION_LOCK_STRIPES)]
 
         self.vector_store = RisklabVectorStore(
             api_key=RISKLAB_OPEN_AI_KEY, namespace="uga-ai", collection_name="vector-store"
@@ -42,174 +259,547 @@ class IndexManager:
             api_key=RISKLAB_OPEN_AI_KEY, namespace="uga-ai", collection_name="summary-store"
         )
 
+        # Built once and shared; every reader below reuses these instead of reconstructing.
         self.vector_index = VectorStoreIndex.from_vector_store(self.vector_store)
         self.summary_index = VectorStoreIndex.from_vector_store(self.summary_store)
         self._load_index_cache: Dict[str, Tuple[VectorStoreIndex, VectorStoreIndex]] = {}
+        self._hash_cache: Optional[Dict[str, str]] = None
+        # Per-document store lookups, memoized for the run; entries are dropped when a file's nodes are deleted.
+        self._store_hash_memo: Dict[str, Optional[str]] = {}
 
     # 1️⃣
     def _load_or_create_index(self, index_cache: Path, vector: bool = True):
-        return (VectorStoreIndex.from_vector_store(self.vector_store)
-                if vector else
-                VectorStoreIndex.from_vector_store(self.summary_store))
+        return self.vector_index if vector else self.summary_index
 
     # 2️⃣
-    def _read_kb_docs(self, kb_dir: Path) -> List[LlamaIndexDocument]:
+    def _kb_reader(self, kb_dir: Path, input_files: Optional[List[str]] = None) -> Optional[SimpleDirectoryReader]:
         if not any(kb_dir.iterdir()):
             self.logger("No files to index.")
-            return []
-        return SimpleDirectoryReader(
-            input_dir=str(kb_dir),
-            recursive=True,
-            required_exts=[".pdf", ".pptx", ".docx", ".xlsx", ".txt", ".pkl"],
-        ).load_data()
-
-    # 3️⃣
-    def _group_documents(self, kb_docs: List[LlamaIndexDocument]) -> Dict[str, List[LlamaIndexDocument]]:
-        out: Dict[str, List[LlamaIndexDocument]] = {}
-        for doc in kb_docs:
-            fp = doc.metadata.get("file_path", "unknown")
-            out.setdefault(fp, []).append(doc)
-        return out
+            return None
+        if input_files is not None:
+            if not input_files:
+                return None
+            return SimpleDirectoryReader(input_files=input_files, file_extractor=_FILE_EXTRACTOR)
+        return SimpleDirectoryReader(input_dir=str(kb_dir), recursive=True, required_exts=KB_EXTS,
+                                     file_extractor=_FILE_EXTRACTOR)
+
+    def _iter_kb_files(self, kb_dir: Path, input_files: Optional[List[str]] = None) -> Iterator[List[LlamaIndexDocument]]:
+        """Yield the documents of one file at a time, as soon as that file is parsed."""
+        reader = self._kb_reader(kb_dir, input_files)
+        if reader:
+            yield from reader.iter_data()
+
+    # Local hash DB of file contents, so unchanged files are never even parsed.
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        with open(path, "rb") as f:
+            # file_digest (3.11+) hashes in OpenSSL with the GIL released.
+            if hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            h = hashlib.sha256()
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+            return h.hexdigest()
+
+    @staticmethod
+    def _open_hash_db() -> sqlite3.Connection:
+        HASH_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(HASH_DB_PATH)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS file_hashes ("
+            "file_path TEXT PRIMARY KEY, file_hash TEXT NOT NULL, last_indexed_ts REAL NOT NULL)"
+        )
+        return conn
+
+    def _load_manifest(self, kb_dir: Path) -> Dict[str, str]:
+        prefix = os.path.join(str(kb_dir), "")
+        try:
+            with closing(self._open_hash_db()) as conn:
+                rows = conn.execute(
+                    "SELECT file_path, file_hash FROM file_hashes WHERE substr(file_path, 1, ?) = ?",
+                    (len(prefix), prefix),
+                )
+                return dict(rows.fetchall())
+        except sqlite3.Error:
+            return {}
+
+    def _save_manifest(self, kb_dir: Path, manifest: Dict[str, str]) -> None:
+        now = time.time()
+        with closing(self._open_hash_db()) as conn, conn:
+            conn.executemany(
+                "INSERT INTO file_hashes (file_path, file_hash, last_indexed_ts) VALUES (?, ?, ?) "
+                "ON CONFLICT(file_path) DO UPDATE SET file_hash = excluded.file_hash, "
+                "last_indexed_ts = excluded.last_indexed_ts",
+                [(fp, h, now) for fp, h in manifest.items()],
+            )
+
+    def _changed_files(self, kb_dir: Path, manifest: Dict[str, str]) -> Tuple[List[str], Dict[str, str]]:
+        """Return (files needing a parse, current {path: sha256}) for the KB directory.
+
+        A hash DB hit is trusted as is; the store is only consulted, in `_classify_task`,
+        for files that are new or changed since their last index.
+        """
+        current = {
+            str(p): self._hash_file(p)
+            for p in kb_dir.rglob("*")
+            if p.is_file() and p.suffix.lower() in KB_EXTS
+        }
+        changed = [fp for fp, h in current.items() if manifest.get(fp) != h]
+        return changed, current
 
     # 4️⃣
     def _get_file_hash_from_store(self, doc_name: str) -> Optional[str]:
+        if doc_name in self._store_hash_memo:
+            return self._store_hash_memo[doc_name]
         filters = MetadataFilters(filters=[MetadataFilter(key="file_path", value=doc_name)])
         try:
             result = self.vector_store.query(VectorStoreQuery(filters=filters, similarity_top_k=1))
-            if result and result.nodes:
-                return result.nodes[0].metadata.get("file_hash")
         except Exception:
-            pass
-        return None
+            return None
+        file_hash = result.nodes[0].metadata.get("file_hash") if result and result.nodes else None
+        self._store_hash_memo[doc_name] = file_hash
+        return file_hash
 
-    def _build_tasks(self, documents: Dict[str, List[LlamaIndexDocument]], streamlit_off: bool=False):
-        tasks = []
-        for doc_name, docs in documents.items():
-            incoming_hash = docs[0].metadata.get("file_hash")
-            existing_hash = self._get_file_hash_from_store(doc_name)
-            if not existing_hash:
-                tasks.append((doc_name, docs, "new", streamlit_off))
-            elif existing_hash != incoming_hash:
-                tasks.append((doc_name, docs, "overwrite", streamlit_off))
-            else:
-                self.logger(f"Skipping {doc_name}, unchanged.")
-        return tasks
+    def _forget_file_hash(self, doc_name: str) -> None:
+        self._store_hash_memo.pop(doc_name, None)
+        if self._hash_cache is not None:
+            self._hash_cache.pop(doc_name, None)
+
+    def _load_all_file_hashes(self) -> Dict[str, str]:
+        """{file_path: file_hash} for the whole store, fetched with one listing call per run."""
+        if self._hash_cache is None:
+            self._hash_cache = self.get_file_names()
+        return self._hash_cache
+
+    def _classify_task(self, doc_name: str, docs: List[LlamaIndexDocument], existing_hash: Optional[str],
+                       streamlit_off: bool = False) -> Optional[Tuple[str, List[LlamaIndexDocument], str, bool]]:
+        incoming_hash = docs[0].metadata.get("file_hash")
+        if not existing_hash:
+            return (doc_name, docs, "new", streamlit_off)
+        if existing_hash != incoming_hash:
+            return (doc_name, docs, "overwrite", streamlit_off)
+        self.logger(f"Skipping {doc_name}, unchanged.")
+        return None
 
     # 5️⃣
-    def _safe_delete_document_nodes(self, doc_name_spaces: str):
-        with self._deletion_lock:
-            try:
-                v_idx = VectorStoreIndex.from_vector_store(self.vector_store)
-                v_retr = VectorIndexRetriever(index=v_idx, similarity_top_k=100)
-                v_hits = v_retr.retrieve(doc_name_spaces)
-                for h in v_hits:
-                    try:
-                        self.vector_store.delete(ref_doc_id=h.node.id_)
-                    except Exception as e:
-                        self.logger(f"Failed to delete vector node: {e}")
-
-                s_idx = VectorStoreIndex.from_vector_store(self.summary_store)
-                s_retr = VectorIndexRetriever(index=s_idx, similarity_top_k=100)
-                s_hits = s_retr.retrieve(doc_name_spaces)
-                for h in s_hits:
-                    try:
-                        self.summary_store.delete(ref_doc_id=h.node.id_)
-                    except Exception as e:
-                        self.logger.warbubg(f"Failed to delete summary node: {e}", streamlit_off=True)
+    def _deletion_lock_for(self, doc_name: str) -> threading.Lock:
+        return self._deletion_locks[hash(doc_name) % _DELETION_LOCK_STRIPES]
 
-                if not v_hits and not s_hits:
-                    self.logger.info(f"No existing nodes found for '{doc_name_spaces}'.", streamlit_off=True)
-            except Exception as e:
-                self.logger.error(f"Unexpected deletion error: {e}", streamlit_off=True)
-                raise
+    def _delete_by_file_path(self, store: RisklabVectorStore, doc_name: str) -> bool:
+        """Delete every node of `doc_name` with one metadata-filter call; False if unsupported."""
+        filters = MetadataFilters(filters=[MetadataFilter(key="file_path", value=doc_name)])
+        try:
+            store.delete_nodes(filters=filters)
+            return True
+        except (AttributeError, NotImplementedError):
+            return False
+
+    def _file_node_ids(self, store: RisklabVectorStore, doc_name: str) -> List[str]:
+        """Ids of every node stored for `doc_name`, found with a metadata-filter query."""
+        filters = MetadataFilters(filters=[MetadataFilter(key="file_path", value=doc_name)])
+        result = store.query(VectorStoreQuery(filters=filters, similarity_top_k=_DELETE_SCAN_LIMIT))
+        if result.ids:
+            return list(result.ids)
+        return [node.node_id for node in (result.nodes or [])]
+
+    def _bulk_delete(self, store: RisklabVectorStore, ids: List[str], kind: str) -> None:
+        """Delete nodes by id in one call if the store supports it, else concurrently one by one."""
+        if not ids:
+            return
+        try:
+            store.delete_nodes(node_ids=ids)
+            return
+        except (AttributeError, NotImplementedError):
+            pass
+        with ThreadPoolExecutor(max_workers=min(16, len(ids))) as executor:
+            futures = [executor.submit(store.delete, ref_doc_id=node_id) for node_id in ids]
+            for f in as_completed(futures):
+                try:
+                    f.result()
+                except Exception as e:
+                    self.logger(f"Failed to delete {kind} node: {e}")
+
+    def _safe_delete_document_nodes(self, doc_name: str, vectors: bool = True, summaries: bool = True):
+        doc_name_spaces = doc_name.replace("_", " ")
+        stores = [
+            (store, kind)
+            for store, kind, wanted in ((self.vector_store, "vector", vectors), (self.summary_store, "summary", summaries))
+            if wanted
+        ]
+        lock = self._deletion_lock_for(doc_name)
+        try:
+            with lock:
+                if all(self._delete_by_file_path(store, doc_name) for store, _ in stores):
+                    if vectors:
+                        self._forget_file_hash(doc_name)
+                    return
+
+            # Fallback for stores without filter deletes: look node ids up by metadata, then
+            # delete by id. A filter-only query needs no query embedding and no ANN search.
+            # The lookups are independent network calls; run them side by side.
+            futures = [_RETRIEVAL_POOL.submit(self._file_node_ids, store, doc_name) for store, _ in stores]
+            hits = [f.result() for f in futures]
+
+            # Only the mutation needs the lock; lookups above run unlocked.
+            with lock:
+                for (store, kind), ids in zip(stores, hits):
+                    self._bulk_delete(store, ids, kind)
+                if vectors:
+                    self._forget_file_hash(doc_name)
+
+            if not any(hits):
+                self.logger(f"No existing nodes found for '{doc_name_spaces}'.")
+        except Exception as e:
+            self.logger(f"Unexpected deletion error: {e}")
+            raise
 
     # 6️⃣
-    def _prepare_nodes(self, task: Tuple[str, List[LlamaIndexDocument], str, bool]):
+    # Splitters hold no per-document state, so one instance of each serves every task.
+    @functools.cached_property
+    def _semantic_splitter(self) -> VectorizedSemanticSplitter:
+        return VectorizedSemanticSplitter(buffer_size=3, breakpoint_percentile_threshold=85)
+
+    @functools.cached_property
+    def _sentence_splitter(self) -> SentenceSplitter:
+        return SentenceSplitter(chunk_size=512, chunk_overlap=128)
+
+    def _prepare_nodes(self, task: Tuple[str, List[LlamaIndexDocument], str, bool]) -> Tuple[str, List[TextNode]]:
+        """Clear stale nodes, then split one document. Summaries and embeddings happen later, in batches."""
         doc_name, docs, action, streamlit_off = task
-        doc_name_spaces = doc_name.replace("_", " ")
         if action == "overwrite":
-            self.logger(f"Re-indexing {doc_name_spaces}...")
-            self._safe_delete_document_nodes(doc_name_spaces)
+            self.logger(f"Re-indexing {doc_name.replace('_', ' ')}...")
+            # The summary is replaced at store time, right before its successor is written.
+            self._safe_delete_document_nodes(doc_name, summaries=False)
 
-        try:
-            splitter = SemanticSplitterNodeParser(buffer_size=3, breakpoint_percentile_threshold=85)
-            nodes = splitter.get_nodes_from_documents(docs)
-        except Exception:
-            splitter = SentenceSplitter(chunk_size=1024, chunk_overlap=200)
-            nodes = splitter.get_nodes_from_documents(docs)
+        nodes = None
+        if self.semantic_split and sum(len(d.text) for d in docs) > SEMANTIC_SPLIT_MIN_CHARS:
+            try:
+                nodes = self._semantic_splitter.get_nodes_from_documents(docs)
+            except Exception:
+                nodes = None
+        if nodes is None:
+            nodes = self._sentence_splitter.get_nodes_from_documents(docs)
+        return (doc_name, nodes)
 
-        summary = self._generate_document_summary(nodes, doc_name_spaces)
-        for node in nodes:
+    @staticmethod
+    def _attach_summary(doc_name: str, nodes: List[TextNode], summary: str) -> Tuple[str, List[TextNode], LlamaIndexDocument]:
+        for i, node in enumerate(nodes):
+            content_hash = hashlib.blake2b(node.text.encode("utf-8"), digest_size=16).hexdigest()
+            # Same file + same chunk text -> same id, so re-adding an unchanged chunk is an upsert.
+            node.id_ = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{doc_name}:{i}:{content_hash}"))
             node.metadata.update({
                 "document_summary": summary,
                 "file_name": os.path.basename(doc_name),
                 "file_path": doc_name,
+                "content_hash": content_hash,
             })
+            # The embedded text is the chunk alone: the same chunk in another file, or under a
+            # regenerated summary, has the same embedding cache key (see _aembed_in_batches).
+            node.excluded_embed_metadata_keys.extend(("content_hash", "document_summary", "file_name", "file_path"))
+            node.excluded_llm_metadata_keys.append("content_hash")
+
+        summary_hash = hashlib.blake2b(summary.encode("utf-8"), digest_size=16).hexdigest()
+        summary_doc = LlamaIndexDocument(
+            id_=str(uuid.uuid5(uuid.NAMESPACE_URL, f"{doc_name}:summary:{summary_hash}")),
+            text=summary,
+            metadata={"file_name": os.path.basename(doc_name), "file_path": doc_name, "summary_hash": summary_hash},
+            excluded_embed_metadata_keys=["summary_hash"],
+            excluded_llm_metadata_keys=["summary_hash"],
+        )
+        return (doc_name, nodes, summary_doc)
 
-        embedded_nodes = Settings.embed_model(nodes)
-        self.vector_store.add(embedded_nodes)
+    @staticmethod
+    def _embed_model_id() -> str:
+        """Identifies the embedding model, so vectors from another model or deployment are never reused."""
+        model = Settings.embed_model
+        return "/".join((
+            type(model).__name__,
+            str(getattr(model, "model_name", "") or ""),
+            str(getattr(model, "deployment_name", "") or ""),
+        ))
 
-        summary_doc = LlamaIndexDocument(text=summary, metadata={"file_name": os.path.basename(doc_name), "file_path": doc_name})
-        embedded_summary = Settings.embed_model([summary_doc])
-        self.summary_store.add(embedded_summary)
+    @staticmethod
+    def _open_embed_cache() -> sqlite3.Connection:
+        EMBED_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(EMBED_CACHE_PATH)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, text_hash BLOB NOT NULL, embedding BLOB NOT NULL, "
+            "last_used_ts REAL NOT NULL, PRIMARY KEY (model, text_hash))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used_ts)")
+        return conn
+
+    def _load_cached_embeddings(self, keys: List[bytes]) -> Dict[bytes, List[float]]:
+        """Cached embeddings for `keys` under the current model; marks the hits as used."""
+        model, found = self._embed_model_id(), {}
+        try:
+            with closing(self._open_embed_cache()) as conn, conn:
+                for start in range(0, len(keys), EMBED_CACHE_LOOKUP_CHUNK):
+                    chunk = keys[start:start + EMBED_CACHE_LOOKUP_CHUNK]
+                    rows = conn.execute(
+                        "SELECT text_hash, embedding FROM embeddings WHERE model = ? AND text_hash IN "
+                        f"({','.join('?' * len(chunk))})",
+                        (model, *chunk),
+                    )
+                    found.update((key, np.frombuffer(blob, dtype=np.float32).tolist()) for key, blob in rows)
+                conn.executemany(
+                    "UPDATE embeddings SET last_used_ts = ? WHERE model = ? AND text_hash = ?",
+                    [(time.time(), model, key) for key in found],
+                )
+        except sqlite3.Error:
+            return {}
+        return found
+
+    def _save_cached_embeddings(self, embeddings: Dict[bytes, List[float]]) -> None:
+        """Append new embeddings; the table is trimmed once per run by _prune_embed_cache."""
+        model, now = self._embed_model_id(), time.time()
+        try:
+            with closing(self._open_embed_cache()) as conn, conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, text_hash, embedding, last_used_ts) VALUES (?, ?, ?, ?)",
+                    [(model, key, np.asarray(vec, dtype=np.float32).tobytes(), now) for key, vec in embeddings.items()],
+                )
+        except sqlite3.Error as e:
+            self.logger(f"Could not update the embedding cache: {e}")
+
+    def _prune_embed_cache(self) -> None:
+        """Drop the least recently used rows beyond EMBED_CACHE_MAX_ROWS; sorts the table, so once per run."""
+        if not EMBED_CACHE_PATH.exists():
+            return
+        try:
+            with closing(self._open_embed_cache()) as conn, conn:
+                conn.execute(
+                    "DELETE FROM embeddings WHERE rowid IN "
+                    "(SELECT rowid FROM embeddings ORDER BY last_used_ts DESC LIMIT -1 OFFSET ?)",
+                    (EMBED_CACHE_MAX_ROWS,),
+                )
+        except sqlite3.Error as e:
+            self.logger(f"Could not prune the embedding cache: {e}")
 
-        return (doc_name, nodes, action, streamlit_off)
+    async def _aembed_in_batches(self, nodes: List[TextNode]) -> None:
+        """Embed nodes from every task together, EMBED_BATCH_SIZE inputs per request.
+
+        Identical texts (headers, footers, boilerplate) are embedded once, and
+        embeddings from earlier runs are reused from the on-disk cache.
+        """
+        texts = [n.get_content(metadata_mode=MetadataMode.EMBED) for n in nodes]
+        keys = [hashlib.blake2b(t.encode("utf-8"), digest_size=16).digest() for t in texts]
+        cache = await asyncio.to_thread(self._load_cached_embeddings, list(dict.fromkeys(keys)))
+        computed: Dict[bytes, List[float]] = {}
+
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cache:
+                missing.setdefault(key, text)
+        missing_keys, missing_texts = list(missing), list(missing.values())
+
+        semaphore = asyncio.Semaphore(EMBED_CONCURRENCY)
+        limiter = AsyncLimiter(EMBED_TOKENS_PER_MINUTE, 60)
+
+        async def embed(batch_keys: List[bytes], batch_texts: List[str]) -> None:
+            # ~4 characters per token is close enough for pacing against the TPM quota.
+            tokens = min(EMBED_TOKENS_PER_MINUTE, max(1, sum(len(t) for t in batch_texts) // 4))
+            async with semaphore:
+                await limiter.acquire(tokens)
+                embeddings = await self._aembed_with_retry(batch_texts)
+            computed.update(zip(batch_keys, embeddings))
+
+        await asyncio.gather(*(
+            embed(missing_keys[start:start + EMBED_BATCH_SIZE], missing_texts[start:start + EMBED_BATCH_SIZE])
+            for start in range(0, len(missing_texts), EMBED_BATCH_SIZE)
+        ))
+
+        cache.update(computed)
+        for node, key in zip(nodes, keys):
+            node.embedding = cache[key]
+        if computed:
+            await asyncio.to_thread(self._save_cached_embeddings, computed)
+
+    @staticmethod
+    @_retry_transient
+    async def _aembed_with_retry(texts: List[str]) -> List[List[float]]:
+        return await Settings.embed_model.aget_text_embedding_batch(texts, show_progress=False)
+
+    @staticmethod
+    @_retry_transient
+    async def _astore_add_with_retry(store: RisklabVectorStore, nodes: List[TextNode]) -> List[str]:
+        return await store.async_add(nodes)
+
+    async def _astore_prepared(self, prepared: Tuple[str, List[TextNode], LlamaIndexDocument]) -> None:
+        doc_name, nodes, summary_doc = prepared
+        if self.quantize_embeddings:
+            _quantize_embeddings([*nodes, summary_doc])
+        # Drop the previous summary (if any) before writing the new one.
+        await asyncio.to_thread(self._safe_delete_document_nodes, doc_name, vectors=False)
+        await asyncio.gather(
+            self._astore_add_with_retry(self.vector_store, nodes),
+            self._astore_add_with_retry(self.summary_store, [summary_doc]),
+        )
 
     # 7️⃣
     def persist_indices(self):
         self.logger("Indices persisted remotely to RisklabVectorStore (no local cache).")
 
     # 8️⃣
+    @staticmethod
+    def _summary_preview(nodes: List) -> str:
+        return "\n".join(n.text for n in islice(nodes, 5))
+
+    def _needs_full_summary(self, nodes: List) -> bool:
+        return self.high_quality_summary and len(nodes) > HIGH_QUALITY_SUMMARY_MIN_NODES
+
     def _generate_document_summary(self, nodes: List, doc_name: str) -> str:
-        summary_prompt = (
-            "Produce a concise and comprehensive summary description. "
-            "Start with 10–25 words describing the document type and purpose. "
-            "Aim for 50–150 words total."
-        )
+        if self._needs_full_summary(nodes):
+            try:
+                from llama_index.core import SummaryIndex
+                # tree_summarize needs O(log N) LLM calls where the default refine mode needs N.
+                query_engine = SummaryIndex(nodes).as_query_engine(response_mode="tree_summarize")
+                return str(query_engine.query(SUMMARY_PROMPT))
+            except Exception:
+                pass
+        # Default: one LLM call over the opening nodes, where a document's purpose is usually stated.
         try:
-            from llama_index.core import SummaryIndex
-            query_engine = SummaryIndex(nodes).as_query_engine()
-            return str(query_engine.query(summary_prompt))
+            return str(Settings.llm.complete("".join((SUMMARY_PROMPT, "\n\n", self._summary_preview(nodes)))))
         except Exception:
+            return "No summary."
+
+    def _generate_document_summaries(self, batch: List[Tuple[str, List[TextNode]]]) -> List[str]:
+        """Summarize several documents in one LLM call; any the reply misses are summarized alone."""
+        summaries: Dict[int, str] = {}
+        if len(batch) > 1:
+            rows = "\n".join(
+                f"===DOC {i}: {doc_name.replace('_', ' ')}===\n{self._summary_preview(nodes)}"
+                for i, (doc_name, nodes) in enumerate(batch, 1)
+            )
             try:
-                return str(Settings.llm.complete(summary_prompt + "\n\n" + "\n".join(n.text for n in nodes[:5])))
+                reply = str(Settings.llm.complete("".join((SUMMARY_BATCH_PROMPT, "\n\n", rows))))
+                parsed = json.loads(reply[reply.find("{"):reply.rfind("}") + 1])
+                summaries = {int(k): str(v).strip() for k, v in parsed.items()}
             except Exception:
-                return "No summary."
+                summaries = {}
+        return [
+            summaries.get(i) or self._generate_document_summary(nodes, doc_name.replace("_", " "))
+            for i, (doc_name, nodes) in enumerate(batch, 1)
+        ]
 
     # 9️⃣
+    async def _astream_index(self, kb_dir: Path, input_files: List[str], max_workers: int,
+                             manifest: Dict[str, str], current: Dict[str, str],
+                             streamlit_off: bool = False, parse_workers: int = 1) -> int:
+        """Read, split, summarize, embed and store, with file parsing overlapped with the later stages.
+
+        `manifest` holds each file's hash as of its last index and `current` its hash now (see
+        `_changed_files`); a file with a manifest row is already in the store and is overwritten.
+        With parse_workers > 1, files are parsed in that many worker processes and queued in
+        the order they finish.
+        """
+        done = object()
+        parsed: queue.Queue = queue.Queue(maxsize=READ_QUEUE_SIZE)
+
+        def produce():
+            try:
+                if parse_workers > 1 and len(input_files) > 1:
+                    # Parsing is CPU-bound; spawn (not fork) since this process runs other threads.
+                    pool = ProcessPoolExecutor(
+                        max_workers=min(parse_workers, len(input_files)),
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                    try:
+                        for future in as_completed([pool.submit(_read_kb_file, fp) for fp in input_files]):
+                            docs = future.result()
+                            if docs:
+                                parsed.put(docs)
+                    finally:
+                        pool.shutdown(cancel_futures=True)
+                else:
+                    for docs in self._iter_kb_files(kb_dir, input_files):
+                        if docs:
+                            parsed.put(docs)
+            finally:
+                parsed.put(done)
+
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(max_workers)
+        # A dedicated thread, so the reader never waits behind prepare jobs in the default executor.
+        producer = loop.run_in_executor(_READER_POOL, produce)
+        known = await asyncio.to_thread(self._load_all_file_hashes)
+
+        # Split documents wait here until a full batch of SUMMARY_BATCH_SIZE can be summarized together.
+        to_summarize: List[Tuple[str, List[TextNode]]] = []
+        summary_jobs = []
+
+        async def summarize(batch: List[Tuple[str, List[TextNode]]]):
+            summaries = await loop.run_in_executor(None, self._generate_document_summaries, batch)
+            return [self._attach_summary(name, nodes, summary) for (name, nodes), summary in zip(batch, summaries)]
+
+        def schedule_summaries(flush: bool = False):
+            while to_summarize and (flush or len(to_summarize) >= SUMMARY_BATCH_SIZE):
+                batch = to_summarize[:SUMMARY_BATCH_SIZE]
+                del to_summarize[:SUMMARY_BATCH_SIZE]
+                summary_jobs.append(asyncio.create_task(summarize(batch)))
+
+        async def handle(docs: List[LlamaIndexDocument]) -> None:
+            doc_name = docs[0].metadata.get("file_path", "unknown")
+            # Stamp the content hash so stored nodes carry it for the store-side lookups below.
+            file_hash = current.get(doc_name)
+            if file_hash:
+                for doc in docs:
+                    doc.metadata["file_hash"] = file_hash
+                    doc.excluded_embed_metadata_keys.append("file_hash")
+                    doc.excluded_llm_metadata_keys.append("file_hash")
+            existing = (
+                manifest.get(doc_name)
+                or known.get(doc_name)
+                or await asyncio.to_thread(self._get_file_hash_from_store, doc_name)
+            )
+            task = self._classify_task(doc_name, docs, existing, streamlit_off)
+            if task is None:
+                return
+            async with semaphore:
+                split = await loop.run_in_executor(None, self._prepare_nodes, task)
+            if self._needs_full_summary(split[1]):
+                summary_jobs.append(asyncio.create_task(summarize([split])))
+            else:
+                to_summarize.append(split)
+                schedule_summaries()
+
+        pending = []
+        while (docs := await asyncio.to_thread(parsed.get)) is not done:
+            pending.append(asyncio.create_task(handle(docs)))
+        await producer
+        await asyncio.gather(*pending)
+        schedule_summaries(flush=True)
+
+        prepared = [p for batch in await asyncio.gather(*summary_jobs) for p in batch]
+        if prepared:
+            await self._aembed_in_batches([n for _, nodes, summary_doc in prepared for n in (*nodes, summary_doc)])
+            await asyncio.gather(*(self._astore_prepared(p) for p in prepared))
+        return len(prepared)
+
     def update_index(self, kb_dir: Path, parallel: bool=True, max_workers: Optional[int]=None, streamlit_off: bool=False):
-        kb_docs = self._read_kb_docs(kb_dir)
-        if not kb_docs:
+        max_workers = max_workers or min(8, os.cpu_count() or 4)
+        self._hash_cache = None  # re-list the store once per run
+        self._store_hash_memo.clear()
+        manifest = self._load_manifest(kb_dir)
+        changed, current = self._changed_files(kb_dir, manifest)
+        if not changed:
             self.logger("Nothing to index.")
+            self._save_manifest(kb_dir, current)
             return
-        documents = self._group_documents(kb_docs)
-        tasks = self._build_tasks(documents, streamlit_off=streamlit_off)
-
-        if parallel and tasks:
-            max_workers = max_workers or min(8, os.cpu_count() or 4)
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = [executor.submit(self._prepare_nodes, t) for t in tasks]
-                for f in as_completed(futures):
-                    _ = f.result()
-        else:
-            for t in tasks:
-                self._prepare_nodes(t)
-        self.logger(f"Indexed {len(tasks)} documents successfully.")
+        indexed = _run_async(self._astream_index(
+            kb_dir, changed, max_workers if parallel else 1, manifest, current, streamlit_off=streamlit_off,
+            parse_workers=max_workers if parallel else 1,
+        ))
+        self._save_manifest(kb_dir, current)
+        self._prune_embed_cache()
+        self.logger(f"Indexed {indexed} documents successfully.")
 
     # 🔟
     def load_index(self, files_sel: List[str] = []) -> Dict[str, Tuple[VectorStoreIndex, VectorStoreIndex]]:
-        selection = set(files_sel) if files_sel else None
-        index: Dict[str, Tuple[VectorStoreIndex, VectorStoreIndex]] = {}
-        doc_names = selection or {"*"}
-        for doc_name in doc_names:
-            if doc_name in self._load_index_cache:
-                index[doc_name] = self._load_index_cache[doc_name]
-                continue
-            v_idx = VectorStoreIndex.from_vector_store(self.vector_store)
-            s_idx = VectorStoreIndex.from_vector_store(self.summary_store)
-            pair = (v_idx, s_idx)
-            self._load_index_cache[doc_name] = pair
-            index[doc_name] = pair
+        # Every selection maps to the same shared pair, cached once under a sentinel key.
+        pair = self._load_index_cache.setdefault("__shared__", (self.vector_index, self.summary_index))
+        index = dict.fromkeys(files_sel or ("*",), pair)
         self.logger("Index loaded successfully.")
         return index
 
@@ -233,8 +823,7 @@ class IndexManager:
     # 12️⃣
     def get_document_summary(self, doc_name: str) -> Optional[str]:
         try:
-            s_idx = VectorStoreIndex.from_vector_store(self.summary_store)
-            s_retr = VectorIndexRetriever(index=s_idx, similarity_top_k=5)
+            s_retr = VectorIndexRetriever(index=self.summary_index, similarity_top_k=5)
             hits = s_retr.retrieve(doc_name)
             for h in hits:
                 return h.metadata.get("document_summary") or h.text
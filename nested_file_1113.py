@@ -1,9 +1,34 @@
 # FileTreeSelector:
+def _build_subtree_index(self) -> None:
+    """Precompute per-node subtree data used on every rerun.
+
+    - self._subtree_text[id(node)]: lowercase names of the node and all descendants, newline-joined.
+    - node.all_files_frozenset: file paths of every file at or below the node.
+
+    Call once after self.tree is built (end of __init__) and again whenever the tree changes.
+    """
+    self._subtree_text: Dict[int, str] = {}
+    for root in self.tree.values():
+        # Iterative post-order walk: every child's data exists before its parent's is built.
+        stack = [(root, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if children_done:
+                children = node.children.values()
+                parts = [node.name.lower()]
+                parts.extend(self._subtree_text[id(child)] for child in children)
+                self._subtree_text[id(node)] = "\n".join(parts)
+                own = (node.file_path,) if node.is_file and node.file_path else ()
+                node.all_files_frozenset = frozenset(own).union(*(child.all_files_frozenset for child in children))
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+
+
 def _node_matches_search(self, node: FileNode, query: str) -> bool:
     """Return True if node or any descendant matches the search query."""
-    if query in node.name.lower():
-        return True
-    return any(self._node_matches_search(child, query) for child in node.children.values())
+    # Names are newline-separated, so a match can never straddle two names.
+    return query in self._subtree_text[id(node)]
 
 
 if search_query and not self._node_matches_search(root, search_query):
@@ -16,14 +41,16 @@ if node.children:
         key = f"folder_{parent_key}_{node.name}_select_all"
         folder_selected = st.checkbox(f"Select all in '{node.name}'", key=key, value=False)
 
-        if folder_selected:
-            # Select all files recursively
-            folder_files = self._get_all_files_in_node(node)
-            self.selected_files.update(folder_files)
-        else:
-            # Unselect all if previously selected
-            folder_files = self._get_all_files_in_node(node)
-            self.selected_files.difference_update(folder_files)
+        # Only touch the selection when the checkbox actually changed since the last rerun,
+        # so the selection itself must outlive the rerun: keep it in session_state.
+        self.selected_files = st.session_state.setdefault("_selected_files", set(self.selected_files))
+        last_key = f"last_{key}"
+        if folder_selected != st.session_state.get(last_key):
+            if folder_selected:
+                self.selected_files |= node.all_files_frozenset
+            else:
+                self.selected_files -= node.all_files_frozenset
+            st.session_state[last_key] = folder_selected
 
         # Render children
         for child_name in sorted(node.children.keys()):
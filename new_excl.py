@@ -1,79 +1,153 @@
+import numpy as np
 import openpyxl
 from openpyxl.chart import (
     BarChart, LineChart, PieChart, AreaChart, ScatterChart,
     RadarChart, BubbleChart, DoughnutChart
 )
-from openpyxl.utils import get_column_letter, column_index_from_string
-from openpyxl.chart.shapes import GraphicalProperties
+from openpyxl.utils.cell import range_boundaries
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
-import re
-from io import BytesIO
-from PIL import Image
+from typing import TYPE_CHECKING, List, Dict, Optional, Set, Tuple
+import functools
+import multiprocessing
+import operator
+import os
+import posixpath
 import tempfile
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+# Sheet-conversion worker processes, started on first use and shared by every parse() call
+_SHEET_POOL: Optional[ProcessPoolExecutor] = None
+_SHEET_POOL_LOCK = threading.Lock()
+
+
+def _get_sheet_pool() -> ProcessPoolExecutor:
+    """
+    The shared sheet-conversion pool. Workers are spawned, not forked: the parser runs
+    alongside other threads (vision calls, callers' pools), and a forked child can inherit
+    a lock one of them held.
+    """
+    global _SHEET_POOL
+    with _SHEET_POOL_LOCK:
+        if _SHEET_POOL is None:
+            _SHEET_POOL = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _SHEET_POOL
+
+
+@functools.lru_cache(maxsize=1)
+def _get_font():
+    """Table-image font, loaded once per process (PIL is imported only when tables are rendered)."""
+    from PIL import ImageFont
+    # Try to use a font, fall back to default if not available
+    try:
+        return ImageFont.truetype("arial.ttf", 12)
+    except OSError:
+        return ImageFont.load_default()
 
 
 class ExcelParser(BaseParser):
+    _VISION_WORKERS = 8  # concurrent GPT-vision calls per sheet
+    # Tables smaller than this are written as plain markdown instead of going through vision
+    _MIN_TABLE_ROWS = 2
+    _MIN_TABLE_COLS = 2
+    # Table images are capped near this many pixels per side; vision upload size dominates
+    _MAX_IMAGE_PX = 1024
+    # Stored dimensions wider than this are the bogus "A1:AMH435" kind, not real data
+    _MAX_TRUSTED_DIM_COLS = 1000
+    # Below this many cells across the chart-free sheets, worker start-up and re-opening
+    # the workbook cost more than converting the sheets in-process
+    _POOL_MIN_CELLS = 200_000
+    
     def __init__(self) -> None:
         super().__init__(name="EXCEL_PARSER")
     
     def parse(self, file_path: Path, file_path_spaces: str) -> List[dict]:
         """Parse Excel file and extract all content including tables, charts, formulas, and macros."""
         documents = []
+        workbook = None
         
         try:
             self.logger.info(f"{file_path_spaces} - Loading Excel workbook...")
-            # Load with data_only=True to get calculated values instead of formulas
-            workbook = openpyxl.load_workbook(file_path, data_only=True, keep_vba=True)
-            
-            # Check for macros
-            has_macros = workbook.vba_archive is not None
+            has_macros, chart_sheets = self._probe_package(file_path)
             if has_macros:
                 self.logger.info(f"{file_path_spaces} - Workbook contains VBA macros")
             
-            total_sheets = len(workbook.sheetnames)
+            # Load with data_only=True to get calculated values instead of formulas.
+            # Cell data always comes from one read-only workbook, which streams cells
+            # without building the full DOM. Read-only worksheets don't expose charts,
+            # so a full load is added only when some worksheet actually has charts.
+            # keep_vba is never needed: nothing is written back, and macro detection
+            # comes from the zip probe. keep_links=False skips parsing cached external-link
+            # workbooks, which are never read.
+            workbook = openpyxl.load_workbook(file_path, data_only=True, read_only=True, keep_links=False)
+            sheet_names = workbook.sheetnames
+            if chart_sheets is None:
+                chart_sheets = set(sheet_names)
+            chart_workbook = (
+                openpyxl.load_workbook(file_path, data_only=True, keep_links=False) if chart_sheets else None
+            )
+            
+            total_sheets = len(sheet_names)
             
             # Create temporary directory for images
             with tempfile.TemporaryDirectory(prefix="excel_img_render_") as tmp_img_dir:
                 images_folder = Path(tmp_img_dir)
+                # Image file names are built from this for every table and chart
+                safe_name = file_path.name.replace(' ', '-')
                 
-                for sheet_idx, sheet_name in enumerate(workbook.sheetnames):
-                    self.logger.info(f"{file_path_spaces} - Processing sheet {sheet_idx + 1}/{total_sheets}: '{sheet_name}'")
-                    
-                    sheet = workbook[sheet_name]
-                    
-                    # Check if it's a Chartsheet (only contains charts) or regular Worksheet
-                    if hasattr(sheet, 'iter_rows'):
-                        # Regular worksheet
-                        md_content = self.convert_sheet_to_markdown(
-                            sheet, 
-                            sheet_name, 
-                            sheet_idx,
-                            file_path,
-                            file_path_spaces,
-                            images_folder,
-                            has_macros=has_macros
-                        )
-                    else:
-                        # Chartsheet - only contains charts, no data cells
-                        self.logger.info(f"{file_path_spaces} - Sheet '{sheet_name}' is a Chartsheet (chart-only)")
-                        md_content = self.convert_chartsheet_to_markdown(
-                            sheet,
-                            sheet_name,
-                            sheet_idx,
-                            file_path,
-                            file_path_spaces,
-                            images_folder
-                        )
-                    
+                md_contents: List[Optional[str]] = [None] * total_sheets
+                pooled = [idx for idx, name in enumerate(sheet_names) if name not in chart_sheets]
+                if len(pooled) < 2 or self._estimate_cells(workbook, [sheet_names[idx] for idx in pooled]) < self._POOL_MIN_CELLS:
+                    pooled = []
+                futures = []
+                if pooled:
+                    # Chart-free sheets are independent; convert them in worker processes.
+                    # Workbooks can't be pickled, so each worker batch opens its own read-only copy.
+                    n_batches = min(len(pooled), os.cpu_count() or 1)
+                    futures = [
+                        (batch, _get_sheet_pool().submit(
+                            _process_sheets, file_path, safe_name, file_path_spaces,
+                            [(sheet_names[idx], idx) for idx in batch], images_folder, has_macros,
+                        ))
+                        for batch in (pooled[i::n_batches] for i in range(n_batches))
+                    ]
+                
+                # Sheets with charts (and everything, when not pooling) run here meanwhile
+                pooled_set = set(pooled)
+                for sheet_idx, sheet_name in enumerate(sheet_names):
+                    if sheet_idx in pooled_set:
+                        continue
+                    md_contents[sheet_idx] = self._convert_sheet(
+                        workbook[sheet_name], sheet_name, sheet_idx, safe_name,
+                        file_path_spaces, images_folder, has_macros,
+                        chart_sheet=chart_workbook[sheet_name] if sheet_name in chart_sheets else None
+                    )
+                for batch, future in futures:
+                    for sheet_idx, md_content in zip(batch, future.result()):
+                        md_contents[sheet_idx] = md_content
+                
+                # The hash and sidecar metadata are per file, not per sheet
+                base_metadata = {
+                    "file_path": file_path_spaces,
+                    "has_macros": has_macros,
+                    "file_hash": compute_file_hash(file_path)
+                }
+                sidecar = self._load_sidecar_metadata(file_path)
+                for sheet_idx, (sheet_name, md_content) in enumerate(zip(sheet_names, md_contents)):
                     metadata = {
-                        "file_path": file_path_spaces,
+                        **base_metadata,
                         "sheet_name": sheet_name,
                         "sheet_number": sheet_idx + 1,
-                        "has_macros": has_macros,
-                        "file_hash": compute_file_hash(file_path)
+                        **sidecar
                     }
-                    metadata.update(self._load_sidecar_metadata(file_path))
                     
                     documents.append({
                         "markdown": md_content,
@@ -86,20 +160,69 @@ class ExcelParser(BaseParser):
         except Exception as e:
             self.logger.error(f"Failed to process {file_path_spaces}: {e}")
             return []
+        finally:
+            # Read-only workbooks keep the archive open until closed.
+            if workbook is not None:
+                workbook.close()
     
-    def convert_sheet_to_markdown(self, sheet, sheet_name: str, sheet_idx: int, file_path: Path, 
-                                  file_path_spaces: str, images_folder: Path, has_macros: bool = False) -> str:
-        """Convert a single Excel sheet to markdown."""
-        md_content = f"# Sheet: {sheet_name}\n\n"
+    def _convert_sheet(self, sheet, sheet_name: str, sheet_idx: int, safe_name: str,
+                       file_path_spaces: str, images_folder: Path, has_macros: bool,
+                       chart_sheet=None) -> str:
+        """
+        Convert one worksheet or chartsheet to markdown.
+        `sheet` comes from the read-only workbook; `chart_sheet` is the same sheet from the
+        fully loaded workbook, given only when the worksheet's charts need to be read.
+        `safe_name` is the file name with spaces replaced, used to name rendered images.
+        """
+        total_sheets = len(sheet.parent.sheetnames)
+        img_prefix = f"{images_folder}/{safe_name}-sheet{sheet_idx}-"
+        self.logger.info(f"{file_path_spaces} - Processing sheet {sheet_idx + 1}/{total_sheets}: '{sheet_name}'")
+        
+        if hasattr(sheet, 'reset_dimensions') and not self._has_trusted_dimension(sheet):
+            # The stored <dimension> is missing or bogus; scan to the real end of the data.
+            sheet.reset_dimensions()
+        
+        # Check if it's a Chartsheet (only contains charts) or regular Worksheet
+        if hasattr(sheet, 'iter_rows'):
+            # Regular worksheet
+            return self.convert_sheet_to_markdown(
+                sheet, 
+                sheet_name, 
+                sheet_idx,
+                img_prefix,
+                file_path_spaces,
+                has_macros=has_macros,
+                chart_sheet=chart_sheet
+            )
+        
+        # Chartsheet (read-only workbooks still load chartsheet charts) - only contains charts, no data cells
+        self.logger.info(f"{file_path_spaces} - Sheet '{sheet_name}' is a Chartsheet (chart-only)")
+        return self.convert_chartsheet_to_markdown(
+            sheet,
+            sheet_name,
+            sheet_idx,
+            img_prefix,
+            file_path_spaces
+        )
+    
+    def convert_sheet_to_markdown(self, sheet, sheet_name: str, sheet_idx: int, img_prefix: str, 
+                                  file_path_spaces: str, has_macros: bool = False,
+                                  chart_sheet=None) -> str:
+        """
+        Convert a single Excel sheet to markdown. Charts are read from `chart_sheet` if given.
+        Rendered images are saved as `{img_prefix}table{n}.png`.
+        """
+        parts: List[str] = [f"# Sheet: {sheet_name}\n\n"]
         
         # Add macro warning if present
         if has_macros:
-            md_content += "⚠️ **Note:** This workbook contains VBA macros.\n\n"
+            parts.append("⚠️ **Note:** This workbook contains VBA macros.\n\n")
         
         # Check if sheet has charts first (before processing data)
-        has_charts = hasattr(sheet, '_charts') and sheet._charts
+        chart_source = chart_sheet if chart_sheet is not None else sheet
+        has_charts = hasattr(chart_source, '_charts') and chart_source._charts
         if has_charts:
-            self.logger.info(f"{file_path_spaces} - Found {len(sheet._charts)} charts in sheet '{sheet_name}'")
+            self.logger.info(f"{file_path_spaces} - Found {len(chart_source._charts)} charts in sheet '{sheet_name}'")
         
         # Get the actual used range (excluding completely empty rows/columns)
         used_range = self._get_used_range(sheet)
@@ -107,39 +230,37 @@ class ExcelParser(BaseParser):
         if not used_range:
             # Sheet has no data cells, but might have charts
             if has_charts:
-                md_content += "*This sheet has no data cells, only charts.*\n\n"
-                charts_md = self._extract_charts_with_vision(sheet, sheet_idx, file_path, file_path_spaces, images_folder)
-                md_content += charts_md
+                parts.append("*This sheet has no data cells, only charts.*\n\n")
+                parts.append(self._extract_charts_with_vision(chart_source, img_prefix, file_path_spaces))
             else:
-                md_content += "*This sheet is empty.*\n\n"
-            return md_content
+                parts.append("*This sheet is empty.*\n\n")
+            return "".join(parts)
         
-        min_row, max_row, min_col, max_col = used_range
+        min_row, max_row, min_col, max_col, values, formats, row_has_data = used_range
         self.logger.debug(f"{file_path_spaces} - Used range: rows {min_row}-{max_row}, cols {min_col}-{max_col}")
         
         # Extract tables with vision analysis
         tables_md = self._extract_tables_with_vision(
-            sheet, 
+            values, 
+            formats, 
             min_row, 
             max_row, 
             min_col, 
             max_col,
-            sheet_idx,
-            file_path,
-            file_path_spaces,
-            images_folder
+            row_has_data,
+            img_prefix,
+            file_path_spaces
         )
-        md_content += tables_md
+        parts.append(tables_md)
         
         # Extract charts with vision analysis (after tables for better organization)
         if has_charts:
-            charts_md = self._extract_charts_with_vision(sheet, sheet_idx, file_path, file_path_spaces, images_folder)
-            md_content += charts_md
+            parts.append(self._extract_charts_with_vision(chart_source, img_prefix, file_path_spaces))
         
-        return md_content
+        return "".join(parts)
     
     def convert_chartsheet_to_markdown(self, chartsheet, sheet_name: str, sheet_idx: int, 
-                                      file_path: Path, file_path_spaces: str, images_folder: Path) -> str:
+                                      img_prefix: str, file_path_spaces: str) -> str:
         """Convert a Chartsheet (chart-only sheet) to markdown."""
         md_content = f"# Chart Sheet: {sheet_name}\n\n"
         md_content += "*This is a dedicated chart sheet (contains only charts, no data cells).*\n\n"
@@ -147,98 +268,266 @@ class ExcelParser(BaseParser):
         # Extract chart information if available
         if hasattr(chartsheet, '_charts') and chartsheet._charts:
             self.logger.info(f"{file_path_spaces} - Found {len(chartsheet._charts)} charts in chartsheet '{sheet_name}'")
-            charts_md = self._extract_charts_with_vision(chartsheet, sheet_idx, file_path, file_path_spaces, images_folder)
+            charts_md = self._extract_charts_with_vision(chartsheet, img_prefix, file_path_spaces)
             md_content += charts_md
         else:
             md_content += "*No charts found in this sheet.*\n\n"
         
         return md_content
     
-    def _get_used_range(self, sheet) -> Optional[Tuple[int, int, int, int]]:
+    @staticmethod
+    def _read_rels(z: zipfile.ZipFile, names: Set[str], part: str) -> List[Tuple[str, str, str]]:
+        """(Id, Type, target part) for each internal relationship of a package part."""
+        base, filename = posixpath.split(part)
+        rels_name = posixpath.join(base, '_rels', filename + '.rels')
+        if rels_name not in names:
+            return []
+        rels = []
+        for rel in ET.fromstring(z.read(rels_name)):
+            if rel.get('TargetMode') == 'External':
+                continue
+            target = rel.get('Target', '')
+            target = target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join(base, target))
+            rels.append((rel.get('Id'), rel.get('Type', ''), target))
+        return rels
+    
+    @classmethod
+    def _probe_package(cls, file_path: Path) -> Tuple[bool, Optional[Set[str]]]:
+        """
+        Check for macros and find the worksheets that hold charts from the xlsx package
+        itself, without loading the workbook: workbook -> worksheet -> drawing -> chart rels.
+        Returns: (has_macros, names of worksheets with charts), or (False, None) if the
+        file can't be probed.
+        """
+        try:
+            with zipfile.ZipFile(file_path) as z:
+                names = set(z.namelist())
+                has_macros = 'xl/vbaProject.bin' in names
+                if not any(name.startswith('xl/charts/chart') for name in names):
+                    return has_macros, set()
+                
+                sheet_parts = {
+                    rid: target for rid, rel_type, target in cls._read_rels(z, names, 'xl/workbook.xml')
+                    if rel_type.endswith('/worksheet')
+                }
+                chart_sheets = set()
+                for el in ET.fromstring(z.read('xl/workbook.xml')).iter():
+                    if el.tag.rsplit('}', 1)[-1] != 'sheet':
+                        continue
+                    rid = next((v for k, v in el.attrib.items() if k.rsplit('}', 1)[-1] == 'id'), None)
+                    sheet_part = sheet_parts.get(rid)
+                    if sheet_part is None:
+                        # Chartsheets load their charts even in read-only mode
+                        continue
+                    drawings = [target for _, rel_type, target in cls._read_rels(z, names, sheet_part)
+                                if rel_type.endswith('/drawing')]
+                    if any(rel_type.endswith('/chart')
+                           for drawing in drawings for _, rel_type, _ in cls._read_rels(z, names, drawing)):
+                        chart_sheets.add(el.get('name'))
+                return has_macros, chart_sheets
+        except (zipfile.BadZipFile, KeyError, ET.ParseError, OSError):
+            # Not a readable xlsx package; let the loads decide.
+            return False, None
+    
+    @classmethod
+    def _has_trusted_dimension(cls, sheet) -> bool:
+        """
+        Whether a read-only sheet's stored <dimension> can bound the cell scan. A sane one lets
+        iter_rows stop at its last row; a bogus one would pad every row out to its width.
+        One that passes here but under-reports the data is caught by _get_used_range.
+        """
+        try:
+            min_col, min_row, max_col, max_row = range_boundaries(sheet.calculate_dimension())
+        except (ValueError, TypeError):
+            # Unsized sheet (no <dimension> element)
+            return False
+        if None in (min_col, min_row, max_col, max_row):
+            return False
+        # A lone "A1" is what some writers emit regardless of content
+        if (min_col, min_row) == (max_col, max_row):
+            return False
+        return max_col <= cls._MAX_TRUSTED_DIM_COLS
+    
+    @classmethod
+    def _estimate_cells(cls, workbook, sheet_names: List[str]) -> int:
+        """
+        Cells across sheet_names by their stored dimensions, read without scanning any rows.
+        A sheet with no usable dimension counts as _POOL_MIN_CELLS, since it may be large.
+        """
+        total = 0
+        for sheet_name in sheet_names:
+            sheet = workbook[sheet_name]
+            if not hasattr(sheet, 'iter_rows'):
+                # Chartsheet: no cells
+                continue
+            if sheet.max_row and sheet.max_column:
+                total += sheet.max_row * sheet.max_column
+            else:
+                total += cls._POOL_MIN_CELLS
+        return total
+    
+    @staticmethod
+    def _nonblank_mask(values: np.ndarray) -> np.ndarray:
+        """
+        Boolean mask of cells holding a non-empty value. Text is stripped when the sheet is
+        read, so blank cells are exactly None or ''; no cell is converted to str here.
+        """
+        return (values != None) & (values != '')  # noqa: E711 - elementwise on an object array
+    
+    def _get_used_range(self, sheet) -> Optional[Tuple[int, int, int, int, np.ndarray, np.ndarray, np.ndarray]]:
         """
-        Get the actual used range of the sheet, excluding completely empty rows and columns.
-        Returns: (min_row, max_row, min_col, max_col) or None if sheet is empty
+        Read the sheet once and return its used range (excluding completely empty rows and
+        columns) together with everything later steps need, so no step re-reads the sheet.
+        Returns: (min_row, max_row, min_col, max_col, values, formats, row_has_data) or None
+        if the sheet is empty. `values` and `formats` are object arrays covering exactly the
+        used range (text stripped; `formats` holds number formats of numeric cells, None elsewhere), and
+        row_has_data[i] is True if row min_row + i is not blank.
         """
-        min_row = None
-        max_row = None
-        min_col = None
-        max_col = None
-        
-        for row in sheet.iter_rows():
-            for cell in row:
-                if cell.value is not None and str(cell.value).strip():
-                    if min_row is None or cell.row < min_row:
-                        min_row = cell.row
-                    if max_row is None or cell.row > max_row:
-                        max_row = cell.row
-                    if min_col is None or cell.column < min_col:
-                        min_col = cell.column
-                    if max_col is None or cell.column > max_col:
-                        max_col = cell.column
-        
-        if min_row is None:
+        # A trusted stored <dimension> (see _has_trusted_dimension) bounds a read-only scan, and
+        # writers sometimes under-report it; read one row and column past it to check.
+        dim_rows = dim_cols = None
+        if hasattr(sheet, 'reset_dimensions') and sheet.max_row and sheet.max_column:
+            dim_rows, dim_cols = sheet.max_row, sheet.max_column
+        rows = sheet.iter_rows(max_row=dim_rows + 1, max_col=dim_cols + 1) if dim_rows else sheet.iter_rows()
+        
+        value_rows = []
+        format_rows = []
+        for row in rows:
+            # Text is stripped once here; blank detection and formatting reuse it
+            row_values = [value.strip() if type(value) is str else value
+                          for value in (cell.value for cell in row)]
+            value_rows.append(row_values)
+            # Number formats only matter for numbers (percent/currency rendering)
+            format_rows.append([cell.number_format if isinstance(value, (int, float)) else None
+                                for cell, value in zip(row, row_values)])
+        if not value_rows:
+            return None
+        
+        # Read-only rows can be ragged; pad them into rectangular arrays.
+        shape = (len(value_rows), max(map(len, value_rows)))
+        values = np.full(shape, None, dtype=object)
+        formats = np.full(shape, None, dtype=object)
+        for row_idx, (row_values, row_formats) in enumerate(zip(value_rows, format_rows)):
+            values[row_idx, :len(row_values)] = row_values
+            formats[row_idx, :len(row_formats)] = row_formats
+        
+        non_blank = self._nonblank_mask(values)
+        if dim_rows and (non_blank[dim_rows:].any() or non_blank[:, dim_cols:].any()):
+            # Data past the stored dimension: drop it and scan to the real end of the sheet
+            sheet.reset_dimensions()
+            return self._get_used_range(sheet)
+        row_has_data = non_blank.any(axis=1)
+        if not row_has_data.any():
             return None
         
-        return (min_row, max_row, min_col, max_col)
+        data_rows = np.flatnonzero(row_has_data)
+        data_cols = np.flatnonzero(non_blank.any(axis=0))
+        min_row, max_row = int(data_rows[0]) + 1, int(data_rows[-1]) + 1
+        min_col, max_col = int(data_cols[0]) + 1, int(data_cols[-1]) + 1
+        
+        used = (slice(min_row - 1, max_row), slice(min_col - 1, max_col))
+        return (min_row, max_row, min_col, max_col, values[used], formats[used], row_has_data[used[0]])
     
     def _extract_tables_with_vision(
         self, 
-        sheet, 
+        values: np.ndarray, 
+        formats: np.ndarray, 
         min_row: int, 
         max_row: int, 
         min_col: int, 
         max_col: int,
-        sheet_idx: int,
-        file_path: Path,
-        file_path_spaces: str,
-        images_folder: Path
+        row_has_data: np.ndarray,
+        img_prefix: str,
+        file_path_spaces: str
     ) -> str:
-        """Extract tables and use GPT vision to describe them."""
-        md_content = ""
+        """
+        Extract tables and use GPT vision to describe them.
+        `values`/`formats` cover the used range starting at (min_row, min_col).
+        """
+        parts: List[str] = []
         
-        # Detect table regions (separated by blank rows/columns)
-        table_regions = self._detect_table_regions(sheet, min_row, max_row, min_col, max_col)
+        # Detect table regions (separated by blank rows/columns). A used range without
+        # blank rows (the common dense sheet) is one table, so skip the split.
+        if row_has_data.all():
+            table_regions = [(min_row, max_row, min_col, max_col)]
+        else:
+            table_regions = self._detect_table_regions(row_has_data, min_row, max_row, min_col, max_col)
         
         if not table_regions:
             # No distinct tables found, treat entire range as one table
             table_regions = [(min_row, max_row, min_col, max_col)]
         
+        # Render every table first, then describe them all with concurrent vision calls
+        table_images: List[Tuple[int, Optional[Path]]] = []
+        small_tables: Dict[int, str] = {}
         for table_idx, (t_min_row, t_max_row, t_min_col, t_max_col) in enumerate(table_regions):
             self.logger.debug(
                 f"{file_path_spaces} - Processing table {table_idx + 1}: "
                 f"rows {t_min_row}-{t_max_row}, cols {t_min_col}-{t_max_col}"
             )
             
-            # Save table as image
             table_count = table_idx + 1
-            img_path = Path(f"{images_folder}/{file_path.name.replace(' ', '-')}-sheet{sheet_idx}-table{table_count}.png")
+            block = (slice(t_min_row - min_row, t_max_row - min_row + 1),
+                     slice(t_min_col - min_col, t_max_col - min_col + 1))
+            if (t_max_row - t_min_row + 1 < self._MIN_TABLE_ROWS
+                    or t_max_col - t_min_col + 1 < self._MIN_TABLE_COLS):
+                # Too small for an image to add anything; skip rendering and the vision call
+                small_tables[table_count] = self._convert_table_region_to_markdown(values[block], formats[block])
+                continue
+            
+            # Save table as image
+            img_path = Path(f"{img_prefix}table{table_count}.png")
             
             # Create a simple image representation of the table using PIL
             try:
-                table_img = self._render_table_as_image(sheet, t_min_row, t_max_row, t_min_col, t_max_col)
-                table_img.save(img_path)
+                table_img = self._render_table_as_image(values[block], formats[block])
+                table_img.save(img_path, optimize=True)
                 self.logger.debug(f"{file_path_spaces} - Table image saved at {img_path}")
-                
+            except Exception as e:
+                self.logger.error(f"{file_path_spaces} - Error processing table {table_count}: {e}")
+                img_path = None
+            table_images.append((table_count, img_path))
+        
+        def describe(item: Tuple[int, Optional[Path]]) -> Optional[str]:
+            table_count, img_path = item
+            if img_path is None:
+                return None
+            try:
                 # Use GPT vision to describe the table
                 self.logger.debug(f"{file_path_spaces} - Analyzing table {table_count} with GPT vision")
-                table_description = self._md4vision(Path(img_path))
-                
-                md_content += f"\n**Table {table_count}**: {table_description}\n\n"
-                
+                return self._md4vision(img_path)
             except Exception as e:
                 self.logger.error(f"{file_path_spaces} - Error processing table {table_count}: {e}")
+                return None
+        
+        # Vision calls are network-bound and independent; results come back in table order
+        with ThreadPoolExecutor(max_workers=self._VISION_WORKERS) as executor:
+            descriptions = list(executor.map(describe, table_images))
+        
+        descriptions_by_table = {
+            table_count: description for (table_count, _), description in zip(table_images, descriptions)
+        }
+        
+        for table_idx in range(len(table_regions)):
+            table_count = table_idx + 1
+            if table_count in small_tables:
+                parts.append(f"\n**Table {table_count}**:\n\n{small_tables[table_count]}\n")
+                continue
+            table_description = descriptions_by_table[table_count]
+            if table_description is None:
                 # Fallback: just note that a table exists
-                md_content += f"\n**Table {table_count}**: [Table data present but could not be analyzed]\n\n"
+                parts.append(f"\n**Table {table_count}**: [Table data present but could not be analyzed]\n\n")
+            else:
+                parts.append(f"\n**Table {table_count}**: {table_description}\n\n")
         
-        return md_content
+        return "".join(parts)
     
-    def _extract_charts_with_vision(self, sheet, sheet_idx: int, file_path: Path, 
-                                    file_path_spaces: str, images_folder: Path) -> str:
+    def _extract_charts_with_vision(self, sheet, img_prefix: str, file_path_spaces: str) -> str:
         """Extract chart information using GPT vision."""
         if not hasattr(sheet, '_charts') or not sheet._charts:
             return ""
         
-        md_content = "\n"
+        parts: List[str] = ["\n"]
         
         for chart_idx, chart in enumerate(sheet._charts):
             chart_count = chart_idx + 1
@@ -258,7 +547,7 @@ class ExcelParser(BaseParser):
                 # Create a text representation for vision analysis
                 # In a real implementation, you'd export the chart as an image here
                 # For now, we'll create a descriptive summary
-                img_path = Path(f"{images_folder}/{file_path.name.replace(' ', '-')}-sheet{sheet_idx}-chart{chart_count}.png")
+                img_path = Path(f"{img_prefix}chart{chart_count}.png")
                 
                 # Try to render chart (this is a placeholder - actual chart rendering requires additional libraries)
                 # In practice, you might use matplotlib or excel export functionality
@@ -266,62 +555,63 @@ class ExcelParser(BaseParser):
                 if chart_data_summary:
                     chart_description += f" showing {chart_data_summary}"
                 
-                md_content += f"**Chart {chart_count} - {chart_title}**: {chart_description}\n\n"
+                parts.append(f"**Chart {chart_count} - {chart_title}**: {chart_description}\n\n")
                 
             except Exception as e:
                 self.logger.error(f"{file_path_spaces} - Error processing chart {chart_count}: {e}")
-                md_content += f"**Chart {chart_count}**: [Chart present but could not be analyzed]\n\n"
+                parts.append(f"**Chart {chart_count}**: [Chart present but could not be analyzed]\n\n")
         
-        return md_content
+        return "".join(parts)
     
-    def _render_table_as_image(self, sheet, min_row: int, max_row: int, 
-                               min_col: int, max_col: int) -> Image.Image:
-        """Render a table region as an image for vision analysis."""
-        from PIL import Image, ImageDraw, ImageFont
+    def _render_table_as_image(self, values: np.ndarray, formats: np.ndarray) -> "Image.Image":
+        """Render a table region (slices of the used-range arrays) as an image for vision analysis."""
+        from PIL import Image, ImageDraw
         
         # Calculate dimensions
-        num_rows = max_row - min_row + 1
-        num_cols = max_col - min_col + 1
+        num_rows, num_cols = values.shape
         
-        cell_width = 150
-        cell_height = 30
+        # Shrink cells so the image stays within _MAX_IMAGE_PX, but never below what
+        # keeps a few characters of text legible (very large tables can exceed the cap)
         padding = 5
+        cell_width = max(40, min(150, (self._MAX_IMAGE_PX - padding * 2) // num_cols))
+        cell_height = max(16, min(30, cell_width // 5, (self._MAX_IMAGE_PX - padding * 2) // num_rows))
+        max_chars = (cell_width - 10) // 7
         
         img_width = num_cols * cell_width + padding * 2
         img_height = num_rows * cell_height + padding * 2
+        grid_right = padding + num_cols * cell_width
+        grid_bottom = padding + num_rows * cell_height
         
-        # Create image
-        img = Image.new('RGB', (img_width, img_height), color='white')
-        draw = ImageDraw.Draw(img)
+        font = _get_font()
         
-        # Try to use a font, fall back to default if not available
-        try:
-            font = ImageFont.truetype("arial.ttf", 12)
-        except:
-            font = ImageFont.load_default()
+        # Create image; black text on white/gray needs only 8-bit grayscale
+        img = Image.new('L', (img_width, img_height), color='white')
+        draw = ImageDraw.Draw(img)
         
-        # Draw table
-        for row_idx, row in enumerate(range(min_row, max_row + 1)):
-            for col_idx, col in enumerate(range(min_col, max_col + 1)):
-                x = col_idx * cell_width + padding
-                y = row_idx * cell_height + padding
-                
-                # Draw cell border
-                draw.rectangle(
-                    [x, y, x + cell_width, y + cell_height],
-                    outline='black',
-                    fill='lightgray' if row_idx == 0 else 'white'  # Header row highlighted
-                )
-                
-                # Get cell value
-                cell = sheet.cell(row, col)
-                cell_value = self._format_cell_value(cell)
+        # Header row highlighted with one fill across all columns
+        draw.rectangle([padding, padding, grid_right, padding + cell_height], fill='lightgray')
+        
+        # Grid: one line per row/column boundary instead of a rectangle per cell
+        for row_idx in range(num_rows + 1):
+            y = padding + row_idx * cell_height
+            draw.line([(padding, y), (grid_right, y)], fill='black')
+        for col_idx in range(num_cols + 1):
+            x = padding + col_idx * cell_width
+            draw.line([(x, padding), (x, grid_bottom)], fill='black')
+        
+        for row_idx, (row_values, row_formats) in enumerate(zip(values, formats)):
+            y = row_idx * cell_height + padding
+            for col_idx, (value, number_format) in enumerate(zip(row_values, row_formats)):
+                cell_value = self._format_cell_value(value, number_format)
+                if not cell_value:
+                    continue
                 
                 # Draw text (truncate if too long)
-                if len(cell_value) > 20:
-                    cell_value = cell_value[:17] + "..."
+                if len(cell_value) > max_chars:
+                    cell_value = cell_value[:max_chars - 3] + "..."
                 
-                draw.text((x + 5, y + 8), cell_value, fill='black', font=font)
+                x = col_idx * cell_width + padding
+                draw.text((x + 5, y + (cell_height - 14) // 2), cell_value, fill='black', font=font)
         
         return img
     
@@ -351,156 +641,126 @@ class ExcelParser(BaseParser):
     
     def _detect_table_regions(
         self, 
-        sheet, 
+        row_has_data: np.ndarray, 
         min_row: int, 
         max_row: int, 
         min_col: int, 
         max_col: int
     ) -> List[Tuple[int, int, int, int]]:
         """
-        Detect separate table regions within the sheet by identifying blank row/column separators.
+        Detect separate table regions within the sheet by identifying blank row separators.
+        `row_has_data` comes from `_get_used_range`, so no cells are read here.
         Returns list of (min_row, max_row, min_col, max_col) tuples.
         """
         # Simple implementation: split by blank rows
         # More sophisticated logic could split by blank columns too
         
-        table_regions = []
-        current_start_row = None
-        
-        for row_idx in range(min_row, max_row + 2):  # +2 to handle end of range
-            # Check if row is blank
-            row_is_blank = True
-            if row_idx <= max_row:
-                for col_idx in range(min_col, max_col + 1):
-                    cell = sheet.cell(row_idx, col_idx)
-                    if cell.value is not None and str(cell.value).strip():
-                        row_is_blank = False
-                        break
-            
-            if not row_is_blank and row_idx <= max_row:
-                if current_start_row is None:
-                    current_start_row = row_idx
-            else:
-                # Found blank row or end of range
-                if current_start_row is not None:
-                    table_regions.append((current_start_row, row_idx - 1, min_col, max_col))
-                    current_start_row = None
-        
-        # Filter out very small regions (single row might be a label)
-        table_regions = [r for r in table_regions if r[1] - r[0] >= 0]
+        # Each run of data rows starts where the padded mask steps 0 -> 1 and ends before 1 -> 0
+        edges = np.diff(np.concatenate(([0], row_has_data.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1) - 1
         
-        return table_regions
+        return [
+            (min_row + int(start), min_row + int(end), min_col, max_col)
+            for start, end in zip(starts, ends)
+        ]
     
-    def _convert_table_region_to_markdown(
-        self, 
-        sheet, 
-        min_row: int, 
-        max_row: int, 
-        min_col: int, 
-        max_col: int
-    ) -> str:
+    def _convert_table_region_to_markdown(self, values: np.ndarray, formats: np.ndarray) -> str:
+        """
+        Convert a table region (slices of the used-range arrays) to a plain markdown table.
+        Used for tables too small to be worth a vision call; the first row is the header.
+        """
+        lines = [
+            "| " + " | ".join(map(self._format_cell_value, row_values, row_formats)) + " |"
+            for row_values, row_formats in zip(values, formats)
+        ]
+        # Header separator, built once per table
+        lines.insert(1, "|" + " --- |" * values.shape[1])
+        return "\n".join(lines) + "\n"
+    
+    # Markdown escaping in one C-level pass: pipes escaped, line breaks preserved as <br>
+    _MD_TRANS = str.maketrans({'|': '\\|', '\n': '<br>'})
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def _number_formatter(number_format: str):
         """
-        This method is no longer used - tables are now converted to images
-        and analyzed with vision. Kept for reference/backwards compatibility.
+        Display formatter for numbers in a given number format. Workbooks use only a handful
+        of formats, so each is classified once and later cells cost a single cache lookup.
         """
-        return ""
+        if '%' in number_format:
+            return '{:.1%}'.format
+        if '$' in number_format or '€' in number_format:
+            return '${:,.0f}'.format
+        return str
     
-    def _format_cell_value(self, cell) -> str:
+    @classmethod
+    def _format_cell_value(cls, value, number_format: Optional[str] = None) -> str:
         """Format cell value for display (calculated values only, no formulas)."""
-        if cell.value is None:
+        if value is None:
             return ""
         
-        value = cell.value
-        
-        # Handle different data types
-        if isinstance(value, (int, float)):
-            # Check if it's formatted as percentage, currency, etc.
-            if cell.number_format:
-                if '%' in cell.number_format:
-                    return f"{value:.1%}"
-                elif '
-    
-    def _get_chart_type(self, chart) -> str:
-        """Determine the chart type."""
-        if isinstance(chart, BarChart):
-            return "Bar Chart"
-        elif isinstance(chart, LineChart):
-            return "Line Chart"
-        elif isinstance(chart, PieChart):
-            return "Pie Chart"
-        elif isinstance(chart, AreaChart):
-            return "Area Chart"
-        elif isinstance(chart, ScatterChart):
-            return "Scatter Chart"
-        elif isinstance(chart, RadarChart):
-            return "Radar Chart"
-        elif isinstance(chart, BubbleChart):
-            return "Bubble Chart"
-        elif isinstance(chart, DoughnutChart):
-            return "Doughnut Chart"
-        else:
-            return "Chart"
- in cell.number_format or '€' in cell.number_format:
-                    return f"${value:,.0f}"
-            return str(value)
-        
-        # Clean up string values
-        value_str = str(value).strip()
-        
-        # Escape pipe characters for markdown tables (only used in image rendering)
-        value_str = value_str.replace('|', '\\|')
-        
-        # Preserve line breaks within cells
-        value_str = value_str.replace('\n', '<br>')
-        
-        return value_str
+        # Handle different data types; exact type checks first for the common cases
+        value_type = type(value)
+        if value_type is str:
+            # Sheet text is stripped when read (_get_used_range)
+            return value.translate(cls._MD_TRANS)
+        if value_type is int or value_type is float or isinstance(value, (int, float)):
+            # Formatted as percentage, currency, etc.
+            return cls._number_formatter(number_format)(value) if number_format else str(value)
+        
+        # Clean up other values (dates, etc.) and escape for markdown tables
+        return str(value).strip().translate(cls._MD_TRANS)
     
     def _extract_charts(self, sheet, file_path_spaces: str) -> str:
         """Extract chart information from the sheet."""
-        md_content = "\n## Charts\n\n"
+        parts: List[str] = ["\n## Charts\n\n"]
         
+        # Charts on a sheet often share ranges (e.g. categories); read each range once
+        range_cache: Dict[str, List] = {}
         for chart_idx, chart in enumerate(sheet._charts):
             self.logger.debug(f"{file_path_spaces} - Processing chart {chart_idx + 1}")
             
-            md_content += f"### Chart {chart_idx + 1}: {chart.title if hasattr(chart, 'title') and chart.title else 'Untitled'}\n\n"
+            parts.append(f"### Chart {chart_idx + 1}: {chart.title if hasattr(chart, 'title') and chart.title else 'Untitled'}\n\n")
             
             # Get chart type
             chart_type = self._get_chart_type(chart)
-            md_content += f"**Type:** {chart_type}\n\n"
+            parts.append(f"**Type:** {chart_type}\n\n")
             
             # Extract chart data
             try:
-                chart_data = self._extract_chart_data(chart, sheet)
+                chart_data = self._extract_chart_data(chart, sheet, range_cache)
                 if chart_data:
-                    md_content += chart_data + "\n"
+                    parts.append(chart_data + "\n")
             except Exception as e:
                 self.logger.error(f"{file_path_spaces} - Error extracting chart data: {e}")
-                md_content += "*Chart data could not be extracted.*\n\n"
+                parts.append("*Chart data could not be extracted.*\n\n")
         
-        return md_content
+        return "".join(parts)
+    
+    _CHART_TYPE_MAP = {
+        BarChart: "Bar Chart",
+        LineChart: "Line Chart",
+        PieChart: "Pie Chart",
+        AreaChart: "Area Chart",
+        ScatterChart: "Scatter Chart",
+        RadarChart: "Radar Chart",
+        BubbleChart: "Bubble Chart",
+        DoughnutChart: "Doughnut Chart",
+    }
     
     def _get_chart_type(self, chart) -> str:
         """Determine the chart type."""
-        if isinstance(chart, BarChart):
-            return "Bar Chart"
-        elif isinstance(chart, LineChart):
-            return "Line Chart"
-        elif isinstance(chart, PieChart):
-            return "Pie Chart"
-        elif isinstance(chart, AreaChart):
-            return "Area Chart"
-        elif isinstance(chart, ScatterChart):
-            return "Scatter Chart"
-        elif isinstance(chart, RadarChart):
-            return "Radar Chart"
-        elif isinstance(chart, BubbleChart):
-            return "Bubble Chart"
-        elif isinstance(chart, DoughnutChart):
-            return "Doughnut Chart"
-        else:
-            return "Unknown Chart Type"
+        chart_type = self._CHART_TYPE_MAP.get(type(chart))
+        if chart_type is None:
+            # Subclasses of the mapped chart classes miss the exact-type lookup
+            chart_type = next(
+                (name for chart_cls, name in self._CHART_TYPE_MAP.items() if isinstance(chart, chart_cls)),
+                "Unknown Chart Type",
+            )
+        return chart_type
     
-    def _extract_chart_data(self, chart, sheet) -> str:
+    def _extract_chart_data(self, chart, sheet, range_cache: Optional[Dict[str, List]] = None) -> str:
         """Extract data from chart series."""
         md_content = "**Data:**\n\n"
         
@@ -513,72 +773,80 @@ class ExcelParser(BaseParser):
         # Get categories (x-axis labels)
         categories = []
         if hasattr(chart, 'categories') and chart.categories:
-            categories = self._parse_chart_reference(chart.categories, sheet)
+            categories = self._parse_chart_reference(chart.categories, sheet, range_cache)
         
-        # Extract each series
+        # Extract each series, collecting the header names in the same pass
+        series_names = []
         for series_idx, series in enumerate(chart.series):
-            series_title = series.title if hasattr(series, 'title') and series.title else f"Series {series_idx + 1}"
+            series_title = series.title if getattr(series, 'title', None) else f"Series {series_idx + 1}"
+            series_names.append(series_title)
             
             # Get series values
-            if hasattr(series, 'val') and series.val:
-                values = self._parse_chart_reference(series.val, sheet)
+            if getattr(series, 'val', None):
+                values = self._parse_chart_reference(series.val, sheet, range_cache)
                 
-                # Create rows
+                # Create rows, initialized with categories
                 if not table_rows:
-                    # Initialize with categories
-                    if categories:
-                        table_rows = [[cat] for cat in categories]
-                    else:
-                        table_rows = [[f"Point {i+1}"] for i in range(len(values))]
+                    labels = categories or [f"Point {i+1}" for i in range(len(values))]
+                    table_rows = [[label] for label in labels]
                 
-                # Add series values
-                for i, value in enumerate(values):
-                    if i < len(table_rows):
-                        table_rows[i].append(str(value))
+                # Add series values (values beyond the first series' rows are dropped)
+                for row, value in zip(table_rows, values):
+                    row.append(str(value))
         
         if not table_rows:
             return "*No chart data available.*\n"
         
         # Build markdown table
-        series_names = [s.title if hasattr(s, 'title') and s.title else f"Series {i+1}" 
-                       for i, s in enumerate(chart.series)]
-        
         header = ["Category"] + series_names
-        md_lines = ["| " + " | ".join(header) + " |"]
-        md_lines.append("| " + " | ".join(["---"] * len(header)) + " |")
+        num_cols = len(header)
+        md_lines = ["| " + " | ".join(header) + " |", "|" + " --- |" * num_cols]
         
         for row in table_rows:
-            # Ensure row has correct number of columns
-            while len(row) < len(header):
-                row.append("")
-            md_lines.append("| " + " | ".join(row[:len(header)]) + " |")
+            # Pad short rows to the header width (rows are never wider than the header)
+            row.extend([""] * (num_cols - len(row)))
+            md_lines.append("| " + " | ".join(row) + " |")
         
         md_content += "\n".join(md_lines) + "\n\n"
         
         return md_content
     
-    def _parse_chart_reference(self, reference, sheet) -> List:
-        """Parse chart data reference and extract values from sheet."""
+    # Cached points are already deserialized objects; map + attrgetter reads them in C
+    _PT_VALUE = operator.attrgetter('v')
+    
+    def _parse_chart_reference(self, reference, sheet, range_cache: Optional[Dict[str, List]] = None) -> List:
+        """
+        Parse chart data reference and extract values from sheet.
+        Cached points are used when present, so the sheet is only read for uncached references;
+        `range_cache` (formula -> values) lets references repeated across a sheet's charts share one read.
+        """
         if not reference:
             return []
         
-        # Handle different reference types
-        if hasattr(reference, 'numRef') and reference.numRef:
+        # Handle different reference types; getattr avoids hasattr's AttributeError round-trips
+        num_ref = getattr(reference, 'numRef', None)
+        if num_ref is not None:
             # Numerical reference
-            if hasattr(reference.numRef, 'numCache') and reference.numRef.numCache:
-                return [pt.v for pt in reference.numRef.numCache.pt]
+            cache = getattr(num_ref, 'numCache', None)
+            if cache is not None:
+                return list(map(self._PT_VALUE, cache.pt))
         
-        if hasattr(reference, 'strRef') and reference.strRef:
+        str_ref = getattr(reference, 'strRef', None)
+        if str_ref is not None:
             # String reference
-            if hasattr(reference.strRef, 'strCache') and reference.strRef.strCache:
-                return [pt.v for pt in reference.strRef.strCache.pt]
+            cache = getattr(str_ref, 'strCache', None)
+            if cache is not None:
+                return list(map(self._PT_VALUE, cache.pt))
         
-        # Try to parse as cell range
-        if hasattr(reference, 'f') and reference.f:
-            formula = reference.f
+        # Try to parse as cell range; data sources keep the formula on their numRef/strRef
+        formula = getattr(reference, 'f', None) or getattr(num_ref if num_ref is not None else str_ref, 'f', None)
+        if not formula:
+            return []
+        if range_cache is None:
             return self._extract_values_from_range(formula, sheet)
-        
-        return []
+        if formula not in range_cache:
+            range_cache[formula] = self._extract_values_from_range(formula, sheet)
+        return range_cache[formula]
     
     def _extract_values_from_range(self, range_str: str, sheet) -> List:
         """Extract values from a cell range string like 'Sheet1!$A$1:$A$10'."""
@@ -587,44 +855,60 @@ class ExcelParser(BaseParser):
             if '!' in range_str:
                 range_str = range_str.split('!')[1]
             
-            # Remove $ signs
-            range_str = range_str.replace('$', '')
+            # Parse range ($ anchors are accepted) and read it with the native range iterator
+            min_col, min_row, max_col, max_row = range_boundaries(range_str)
             
-            # Parse range
-            if ':' in range_str:
-                start, end = range_str.split(':')
-                start_col = column_index_from_string(re.sub(r'\d', '', start))
-                start_row = int(re.sub(r'\D', '', start))
-                end_col = column_index_from_string(re.sub(r'\d', '', end))
-                end_row = int(re.sub(r'\D', '', end))
-                
-                values = []
-                for row in range(start_row, end_row + 1):
-                    for col in range(start_col, end_col + 1):
-                        cell = sheet.cell(row, col)
-                        if cell.value is not None:
-                            values.append(cell.value)
-                
-                return values
+            # Whole-column/row ("A:A") or oversized references would otherwise be walked
+            # to row 1048576; clamp them to the sheet's data (unknown for unsized read-only sheets)
+            sheet_max_row, sheet_max_col = sheet.max_row, sheet.max_column
+            if sheet_max_row is not None:
+                max_row = min(max_row or sheet_max_row, sheet_max_row)
+            if sheet_max_col is not None:
+                max_col = min(max_col or sheet_max_col, sheet_max_col)
+            
+            rows = sheet.iter_rows(
+                min_row=min_row, max_row=max_row,
+                min_col=min_col, max_col=max_col,
+                values_only=True,
+            )
+            return [value for row in rows for value in row if value is not None]
         except Exception:
             return []
-        
-        return []
     
     def _extract_merged_cells_info(self, sheet) -> str:
         """Extract information about merged cells (indicates complex layouts)."""
-        if not sheet.merged_cells.ranges:
+        ranges = list(sheet.merged_cells.ranges)
+        if not ranges:
             return ""
         
         md_content = "\n## Merged Cells\n\n"
         md_content += "*This sheet contains merged cells, which may indicate complex formatting:*\n\n"
+        md_content += "".join(f"- {merged_range}\n" for merged_range in ranges[:10])  # Limit to first 10
         
-        for merged_range in list(sheet.merged_cells.ranges)[:10]:  # Limit to first 10
-            md_content += f"- {merged_range}\n"
-        
-        if len(sheet.merged_cells.ranges) > 10:
-            md_content += f"- ... and {len(sheet.merged_cells.ranges) - 10} more\n"
+        if len(ranges) > 10:
+            md_content += f"- ... and {len(ranges) - 10} more\n"
         
         md_content += "\n"
         
         return md_content
+
+
+@functools.lru_cache(maxsize=1)
+def _get_worker_parser() -> "ExcelParser":
+    """One ExcelParser (and vision client) per worker process, reused across batches."""
+    return ExcelParser()
+
+
+def _process_sheets(file_path: Path, safe_name: str, file_path_spaces: str, sheets: List[Tuple[str, int]],
+                    images_folder: Path, has_macros: bool) -> List[str]:
+    """Convert a batch of (sheet_name, sheet_idx) sheets in a worker process (see ExcelParser.parse)."""
+    parser = _get_worker_parser()
+    workbook = openpyxl.load_workbook(file_path, data_only=True, read_only=True, keep_links=False)
+    try:
+        return [
+            parser._convert_sheet(workbook[sheet_name], sheet_name, sheet_idx, safe_name,
+                                  file_path_spaces, images_folder, has_macros)
+            for sheet_name, sheet_idx in sheets
+        ]
+    finally:
+        workbook.close()
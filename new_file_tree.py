@@ -1,6 +1,9 @@
 import streamlit as st
 from typing import Dict, List, Optional
 
+from app.config.path_options import filter_paths, sorted_paths
+
+
 class FileTreeSelector:
     """Flat searchable file selector with a working Select All toggle."""
 
@@ -8,8 +11,8 @@ class FileTreeSelector:
         self.file_metadata = file_metadata or {}
         self.state_key = state_key
 
-        # All file paths
-        self.options = sorted(self.file_metadata.keys(), key=str.lower)
+        # All file paths (sorted and lowercased once per distinct path set, not on every rerun)
+        self.options, self.options_lower = sorted_paths(frozenset(self.file_metadata))
 
         # Widget keys (allowed to modify inside callbacks)
         self.k_search = f"{state_key}_search"
@@ -30,10 +33,7 @@ class FileTreeSelector:
         if st.session_state[self.k_selectall]:
             # Select ALL visible filtered items
             search = st.session_state[self.k_search].lower()
-            filtered = [
-                p for p in self.options
-                if search in p.lower()
-            ]
+            filtered = filter_paths(self.options, self.options_lower, search)
             st.session_state[self.k_multiselect] = filtered
         else:
             # Clear all selected
@@ -63,11 +63,8 @@ class FileTreeSelector:
             placeholder="Type to filter files…",
         ).lower()
 
-        # FILTERED OPTIONS
-        filtered = [
-            p for p in self.options
-            if search in p.lower()
-        ]
+        # FILTERED OPTIONS (against the precomputed lowercase paths)
+        filtered = filter_paths(self.options, self.options_lower, search)
 
         # SELECT ALL
         container.checkbox(
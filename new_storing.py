@@ -1,29 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from llama_index.core import Document, Settings
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.vector_stores import MetadataFilter, MetadataFilters, VectorStoreQuery
+
+# Node ids fetched per metadata query when a store can't delete by filter.
+_DELETE_PAGE_SIZE = 1000
+
+
+def _delete_file_nodes(self, store, file_name: str) -> None:
+    """Delete every node of file_name from store with one metadata-filter call."""
+    filters = MetadataFilters(filters=[MetadataFilter(key="file_name", value=file_name)])
+    try:
+        store.delete_nodes(filters=filters)
+        return
+    except (AttributeError, NotImplementedError):
+        pass
+
+    # Store can't delete by filter: look ids up by metadata a page at a time and delete each
+    # page together, until the query comes back empty
+    query = VectorStoreQuery(filters=filters, similarity_top_k=_DELETE_PAGE_SIZE)
+    seen = set()
+    while True:
+        result = store.query(query)
+        ids = list(result.ids) if result.ids else [node.node_id for node in (result.nodes or [])]
+        # Ids seen before weren't deleted; stop rather than query them forever
+        ids = [node_id for node_id in ids if node_id not in seen]
+        if not ids:
+            return
+        seen.update(ids)
+        try:
+            store.delete_nodes(node_ids=ids)
+        except (AttributeError, NotImplementedError):
+            for node_id in ids:
+                store.delete(node_id)
+
 def _delete_document(self, file_name: str):
     """Delete all vector + summary nodes for a given file_name."""
     # Delete from vector_store
     try:
-        vindex = VectorStoreIndex.from_vector_store(self.vector_store)
-        vretriever = VectorIndexRetriever(index=vindex, similarity_top_k=1000)
-        vector_results = vretriever.retrieve("TextNode")
-
-        for node in vector_results:
-            if node.metadata.get("file_name") == file_name:
-                self.vector_store.delete(node.node_id)
-
+        self._delete_file_nodes(self.vector_store, file_name)
         self.logger.info(f"✅ Deleted old vector embeddings for {file_name}")
     except Exception as e:
         self.logger.error(f"❌ Failed deleting vector embeddings for {file_name}: {e}")
 
     # Delete from summary_store
     try:
-        sindex = VectorStoreIndex.from_vector_store(self.summary_store)
-        sretriever = VectorIndexRetriever(index=sindex, similarity_top_k=1000)
-        summary_results = sretriever.retrieve("Document")
-
-        for node in summary_results:
-            if node.metadata.get("file_name") == file_name:
-                self.summary_store.delete(node.node_id)
-
+        self._delete_file_nodes(self.summary_store, file_name)
         self.logger.info(f"✅ Deleted old summary embeddings for {file_name}")
     except Exception as e:
         self.logger.error(f"❌ Failed deleting summary embeddings for {file_name}: {e}")
@@ -39,10 +62,6 @@ def _save_document_embeddings(self, file_path: str, docs, file_name: str):
         node.metadata["file_name"] = file_name
         node.metadata["file_path"] = file_path
 
-    # ✅ Add vector embeddings
-    self.vector_store.add(Settings.embed_model(nodes))
-    self.logger.info(f"🧠 Added {len(nodes)} vector nodes for {file_name}")
-
     # ✅ Build summaries
     def summarize_document(doc: Document):
         summary_prompt = f"Summarize in 5 concise sentences:\n\n{doc.text}"
@@ -50,15 +69,22 @@ def _save_document_embeddings(self, file_path: str, docs, file_name: str):
         return Document(text=str(summary_text),
                         metadata={"file_name": file_name, "file_path": file_path})
 
-    summary_docs = [summarize_document(d) for d in docs]
+    # Each summary is an independent LLM round-trip, so run them concurrently
+    with ThreadPoolExecutor(max_workers=min(8, len(docs)) or 1) as executor:
+        summary_docs = list(executor.map(summarize_document, docs))
     summary_nodes = splitter.get_nodes_from_documents(summary_docs)
 
     for snode in summary_nodes:
         snode.metadata["file_name"] = file_name
         snode.metadata["file_path"] = file_path
 
-    # ✅ Add summary embeddings
-    self.summary_store.add(Settings.embed_model(summary_nodes))
+    # ✅ Embed vector + summary nodes in one batched call, then split them back out
+    embedded = Settings.embed_model(nodes + summary_nodes)
+
+    self.vector_store.add(embedded[:len(nodes)])
+    self.logger.info(f"🧠 Added {len(nodes)} vector nodes for {file_name}")
+
+    self.summary_store.add(embedded[len(nodes):])
     self.logger.info(f"🧾 Added {len(summary_nodes)} summary nodes for {file_name}")
 
 
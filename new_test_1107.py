@@ -1,12 +1,11 @@
 import os
 import hashlib
-from typing import Dict, List
+from typing import Dict
 
 from llama_index.core import Document as LlamaIndexDocument
 from llama_index.core import VectorStoreIndex
 from llama_index.core.retrievers import VectorIndexRetriever
 from llama_index.core.node_parser import SentenceSplitter
-from llama_index.readers.file import PDFReader
 
 from risklab_vector_store import RisklabVectorStore  # your import
 from settings import Settings
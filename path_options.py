@@ -0,0 +1,26 @@
+"""
+path_options.py
+
+Sorted, searchable file-path options shared by the flat file selectors
+(file_selector.py and new_file_tree.py).
+"""
+
+import functools
+from typing import FrozenSet, List, Sequence, Tuple
+
+
+@functools.lru_cache(maxsize=8)
+def sorted_paths(paths: FrozenSet[str]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Case-insensitively sorted file paths and their lowercase forms (for search filtering).
+    Streamlit rebuilds the selectors on every rerun, so both are computed once per path set.
+    """
+    options = tuple(sorted(paths, key=str.lower))
+    return options, tuple(p.lower() for p in options)
+
+
+def filter_paths(options: Sequence[str], options_lower: Sequence[str], search_lower: str) -> List[str]:
+    """Options whose path contains search_lower (case-insensitive); all of them if it is empty."""
+    if not search_lower:
+        return list(options)
+    return [p for p, p_lower in zip(options, options_lower) if search_lower in p_lower]
@@ -1,7 +1,12 @@
+import hashlib
+import logging
 import os
+import pickle
+import tempfile
+from pathlib import Path
+
 from llama_index.core import Document
 from llama_index.core.node_parser import SentenceSplitter
-from llama_index.readers.file import PDFReader
 from llama_index.core import VectorStoreIndex
 from llama_index.core.retrievers import VectorIndexRetriever
 
@@ -16,6 +21,68 @@ FILEPATH = f"/mnt/data/{FILENAME}"
 vector_store = RisklabVectorStore("kb_vector_store")
 summary_store = RisklabVectorStore("kb_summary_store")
 
+logger = logging.getLogger(__name__)
+
+PDF_CACHE_DIR = Path.home() / ".cache" / "indexmgr"
+# Parsed PDFs kept in the cache; the least recently used are deleted beyond this
+PDF_CACHE_MAX_ENTRIES = 256
+
+
+# -----------------------------
+# LOAD PDF (CACHED)
+# -----------------------------
+
+def load_pdf_cached(filepath: str):
+    """Parse a PDF once; reuse the pickled result until the file's mtime or size changes."""
+    stat = os.stat(filepath)
+    key = f"{os.path.abspath(filepath)}:{stat.st_mtime_ns}:{stat.st_size}"
+    cache_file = PDF_CACHE_DIR / f"{hashlib.sha1(key.encode()).hexdigest()}.pkl"
+
+    if cache_file.exists():
+        with open(cache_file, "rb") as f:
+            docs = pickle.load(f)
+        os.utime(cache_file)  # mark as recently used for pruning
+        return docs
+
+    from llama_index.readers.file import PDFReader  # only needed on a cache miss
+
+    docs = PDFReader(return_full_document=True).load_data(filepath)
+
+    # Write to a temp file and rename so a crash never leaves a half-written cache entry
+    PDF_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=PDF_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(docs, f)
+        os.replace(tmp_path, cache_file)
+    except Exception as e:
+        # The cache is only an optimization; drop the partial file and return the parse
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        logger.warning("Could not cache parsed %s: %s", filepath, e)
+    else:
+        _prune_pdf_cache()
+
+    return docs
+
+
+def _prune_pdf_cache():
+    """Delete the least recently used cache entries beyond PDF_CACHE_MAX_ENTRIES."""
+    entries = []
+    for path in PDF_CACHE_DIR.glob("*.pkl"):
+        try:
+            entries.append((path.stat().st_mtime, path))
+        except FileNotFoundError:
+            continue  # removed by another process since the glob
+    entries.sort(reverse=True)
+    for _, stale in entries[PDF_CACHE_MAX_ENTRIES:]:
+        try:
+            stale.unlink()
+        except FileNotFoundError:
+            continue
+
 
 # -----------------------------
 # DELETE OLD EMBEDDINGS
@@ -64,7 +131,7 @@ def readd_file(filepath: str):
     delete_document_from_store(file_name)
 
     # ✅ Step 2: load + split
-    docs = PDFReader(return_full_document=True).load_data(filepath)
+    docs = load_pdf_cached(filepath)
     splitter = SentenceSplitter(chunk_size=512, chunk_overlap=50)
 
     nodes = splitter.get_nodes_from_documents(docs)
@@ -0,0 +1,50 @@
+"""Embedding cache in index.IndexManager: the chunk text alone decides whether to embed."""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+# Only read at import, to build the Azure clients; nothing below calls Azure.
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://example.invalid")
+pytest.importorskip("llama_index.core")
+pytest.importorskip("risklab.vectorstore.llamaindex")
+index = pytest.importorskip("index")
+from llama_index.core.schema import TextNode  # noqa: E402
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(index, "EMBED_CACHE_PATH", tmp_path / "embed_cache.db")
+    monkeypatch.setattr(index.IndexManager, "_embed_model_id", staticmethod(lambda: "test-model"))
+    calls = []
+
+    async def fake_embed(texts):
+        calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+    monkeypatch.setattr(index.IndexManager, "_aembed_with_retry", staticmethod(fake_embed))
+    mgr = object.__new__(index.IndexManager)
+    mgr.logger = lambda *args: None
+    return mgr, calls
+
+
+def _chunks(doc_name, summary, text="Confidential - internal use only. Page footer."):
+    _, nodes, _ = index.IndexManager._attach_summary(doc_name, [TextNode(text=text)], summary)
+    return nodes
+
+
+def test_same_chunk_text_is_embedded_once(manager):
+    mgr, calls = manager
+
+    # The same boilerplate chunk in two files, in one run
+    nodes = _chunks("/kb/a.pdf", "Summary of A.") + _chunks("/kb/b.pdf", "Summary of B.")
+    asyncio.run(mgr._aembed_in_batches(nodes))
+    # A later re-index of a.pdf, where the LLM words the summary differently
+    rerun = _chunks("/kb/a.pdf", "A reworded summary of A.")
+    asyncio.run(mgr._aembed_in_batches(rerun))
+
+    assert len(calls) == 1 and len(calls[0]) == 1
+    assert nodes[0].embedding == nodes[1].embedding == rerun[0].embedding